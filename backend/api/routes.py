@@ -4,10 +4,13 @@ from typing import List, Optional
 from backend.services.contract_service import deploy_erc1400, mint_by_partition, set_document, get_artifact
 from backend.database import add_contract, get_contracts, load_db, save_db, add_mint_event, get_mint_events
 from backend.services.cobo_service import cobo_client
+from backend.services import ledger
+from backend.services import issuance
 from web3 import Web3
 import time
 
 router = APIRouter()
+issuance.register()
 
 class DeployRequest(BaseModel):
     chain_id: str
@@ -146,25 +149,7 @@ def mint_token(request: MintRequest):
 
 @router.get("/tokens/{chain_id}/{address}/holders")
 def get_token_holders(chain_id: str, address: str):
-    events = get_mint_events(chain_id, address)
-    
-    # Aggregate balances
-    holders = {}
-    for e in events:
-        recipient = e["to_address"]
-        partition = e["partition"]
-        amount = e["amount"]
-        
-        key = f"{recipient}_{partition}"
-        if key not in holders:
-            holders[key] = {
-                "address": recipient,
-                "partition": partition,
-                "balance": 0
-            }
-        holders[key]["balance"] += amount
-        
-    return list(holders.values())
+    return ledger.get_holders(chain_id, address)
 
 @router.post("/tokens/document")
 def upload_document(request: DocumentRequest):
@@ -1,3 +1,4 @@
+import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from typing import Optional
@@ -8,6 +9,43 @@ class Settings(BaseSettings):
     chain_id: str = Field("ETH_SEPOLIA", description="Default Chain ID")
     cobo_api_url: str = Field("https://api.cobo.com/v2", description="Cobo API Base URL")
     cobo_default_wallet_id: str = Field("07f7a5de-b138-4f80-a299-9f66450624d5", description="Default Cobo Wallet ID")
+
+    # Cobo HTTP connection pooling
+    cobo_http_max_connections: int = Field(32, description="Max pooled connections to the Cobo API")
+    cobo_http_max_connections_per_host: int = Field(16, description="Max concurrent connections per Cobo host (async client)")
+    cobo_http_timeout: float = Field(30.0, description="Total Cobo request timeout in seconds")
+    cobo_http_connect_timeout: float = Field(5.0, description="Cobo connect timeout in seconds")
+
+    # Upstream resilience (Cobo and chain RPC)
+    rpc_request_timeout: float = Field(10.0, description="Chain RPC request timeout in seconds")
+    request_deadline_seconds: float = Field(25.0, description="Default upstream budget for one API request")
+    upstream_retry_attempts: int = Field(3, description="Attempts per upstream call, including the first")
+    upstream_retry_base_delay: float = Field(0.2, description="Base delay for jittered exponential backoff")
+    upstream_retry_max_delay: float = Field(2.0, description="Upper bound for a single backoff delay")
+    circuit_failure_threshold: int = Field(5, description="Consecutive transient failures before a circuit opens")
+    circuit_reset_timeout: float = Field(30.0, description="Seconds an open circuit waits before probing again")
+
+    # Per-upstream concurrency of blocking calls made from async endpoints
+    cobo_max_concurrency: int = Field(16, description="Concurrent blocking Cobo SDK calls")
+    rpc_max_concurrency: int = Field(32, description="Concurrent blocking chain RPC calls")
+    store_max_concurrency: int = Field(8, description="Concurrent blocking store (file) operations")
+
+    # Cold starts: defer SDK imports / ABI loads to first use instead of server startup
+    lazy_startup: bool = Field(default_factory=lambda: bool(os.environ.get("VERCEL")),
+                               description="Skip the startup warm-up (default on Vercel)")
+
+    # Event indexer
+    indexer_chunk_size: int = Field(2000, description="Initial eth_getLogs block range per chunk")
+    indexer_max_chunk_size: int = Field(5000, description="Largest block range the indexer grows a chunk to")
+    indexer_default_lookback: int = Field(50000, description="Blocks to scan when no deployment block is known")
+    indexer_decode_workers: int = Field(0, description="Processes used to decode large log batches (0 = in-process)")
+    indexer_concurrency: int = Field(4, description="Block-range chunks scanned in parallel across a chain's RPC endpoints")
+    reconcile_concurrency: int = Field(4, description="Chains (and the Cobo lookup) reconciled in parallel")
+    reconcile_receipt_timeout: float = Field(86400.0, description="Seconds a transaction may go without a receipt before reconciliation marks it invalid")
+    block_cache_size: int = Field(100000, description="Block timestamps kept per chain in the header cache")
+    claimable_cache_ttl: float = Field(30.0, description="Seconds a claimable-rewards lookup is reused by portfolio views")
+    contract_refresh_interval: float = Field(10.0, description="Minimum seconds between background refreshes of pending deployments and confirmations")
+    claimable_cache_size: int = Field(10000, description="Claimable-rewards lookups kept, least recently used evicted first")
     
     # Allow loading from .env file
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
@@ -1,50 +1,473 @@
 import json
 import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Dict, Any
 
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the (slower) standard library encoder
+    orjson = None
+
 # Use absolute path for Vercel compatibility
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-# Go up one level from 'backend' to root, then into 'backend' (redundant but safe if structure changes)
-# Actually, this file is in 'backend/', so DB_FILE should be in the same dir or we resolve from root.
-# Let's assume db.json is in 'backend/' alongside database.py
-DB_FILE = os.path.join(BASE_DIR, "db.json")
+if os.environ.get("VERCEL"):
+    # Vercel's deployment filesystem is read-only; work on a copy in /tmp,
+    # made on first access rather than at import (cold start)
+    DB_FILE = "/tmp/db.json"
+    SEED_DB_FILE = os.path.join(BASE_DIR, "db.json")
+else:
+    DB_FILE = os.path.join(BASE_DIR, "db.json")
+    SEED_DB_FILE = None
+
+_lock = threading.RLock()
+_seeded = False
+
+
+def ensure_db_file():
+    """Copy the bundled db.json to DB_FILE once, if the store lives elsewhere."""
+    global _seeded
+    if _seeded:
+        return
+    with _lock:
+        if _seeded:
+            return
+        if SEED_DB_FILE and not os.path.exists(DB_FILE) and os.path.exists(SEED_DB_FILE):
+            try:
+                shutil.copy(SEED_DB_FILE, DB_FILE)
+                print(f"DEBUG: Copied {SEED_DB_FILE} to {DB_FILE}")
+            except Exception as e:
+                print(f"DEBUG: Failed to copy db.json: {e}")
+        _seeded = True
+
+
+def _normalize(data) -> Dict[str, Any]:
+    """Upgrade legacy layouts (a bare contract list) and fill missing collections."""
+    if isinstance(data, list):
+        data = {"contracts": data}
+    if not isinstance(data, dict):
+        data = {}
+    data.setdefault("contracts", [])
+    data.setdefault("mints", [])
+    return data
+
 
 def load_db() -> Dict[str, Any]:
+    ensure_db_file()
     if not os.path.exists(DB_FILE):
-        return {"contracts": []}
-    with open(DB_FILE, 'r') as f:
+        return _normalize({})
+    with open(DB_FILE, 'rb') as f:
+        raw = f.read()
+    try:
+        return _normalize(orjson.loads(raw) if orjson else json.loads(raw))
+    except ValueError:  # JSONDecodeError of either library
+        return _normalize({})
+
+
+def encode_db(data: Dict[str, Any]) -> bytes:
+    """
+    Compact (non-indented) JSON encoding of the store.
+
+    Use scripts/export_db.py for a pretty-printed copy.
+    """
+    if orjson:
         try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {"contracts": []}
+            return orjson.dumps(data)
+        except TypeError:
+            # orjson stops at 64-bit integers; the standard encoder has no limit
+            pass
+    return json.dumps(data, separators=(",", ":")).encode()
+
 
 def save_db(data: Dict[str, Any]):
+    """Atomically replace the DB file so readers never see a partial write."""
     try:
-        with open(DB_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        tmp_file = f"{DB_FILE}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(encode_db(data))
+        os.replace(tmp_file, DB_FILE)
     except OSError:
         # Vercel file system is read-only
         print("Warning: Could not write to database (Read-only filesystem)")
 
+
+@contextmanager
+def _file_lock():
+    """Serialize writers across processes (API server, indexer, scripts)."""
+    if fcntl is None:
+        yield
+        return
+    try:
+        lock_file = open(f"{DB_FILE}.lock", "a")
+    except OSError:
+        yield
+        return
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+
+# Confirmation tracking moves these on every poll until a deployment is final;
+# on their own they are not a change clients sync (status, address, finality are)
+UNSTAMPED_FIELDS = ("block_number", "block_hash", "confirmations")
+
+
+def _fingerprint(record: Dict[str, Any]) -> bytes:
+    record = {k: v for k, v in record.items() if k not in UNSTAMPED_FIELDS}
+    if orjson:
+        try:
+            return orjson.dumps(record, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(record, sort_keys=True).encode()
+
+
+def _stamp_changes(data: Dict[str, Any], before: List[bytes]):
+    """
+    Advance the change sequence if any contract was added, changed or removed
+    (changes to UNSTAMPED_FIELDS alone do not count).
+
+    The store's `seq` only ever increases; each added or changed contract is
+    stamped with the `seq` of the transaction that last changed it.
+    """
+    remaining = set(before)
+    changed = [c for c in data["contracts"] if _fingerprint(c) not in remaining]
+    removed = len(data["contracts"]) - len(changed) < len(before)
+    if changed or removed:
+        seq = data.get("seq", 0) + 1
+        data["seq"] = seq
+        for c in changed:
+            c["seq"] = seq
+
+
+# Status transitions persisted with the store, for the /events stream
+EVENT_LOG_SIZE = 1000
+
+_listeners = []
+_observers = []
+
+# Collections whose record changes each transaction tracks for its observers
+TRACKED_COLLECTIONS = ("mints", "transfers")
+
+
+class TrackedList(list):
+    """
+    A store collection that remembers which records a transaction added,
+    replaced or removed, so observers get the changes instead of rescanning.
+
+    Appending, assigning, deleting and popping are tracked; a record edited
+    in place must be announced with touch() before it is changed.
+    """
+
+    def __init__(self, records=()):
+        super().__init__(records)
+        self._added = {}    # id -> record, as it is at commit
+        self._removed = {}  # id -> record as loaded (a copy if touched)
+
+    def _add(self, record):
+        self._added[id(record)] = record
+
+    def _drop(self, record):
+        key = id(record)
+        if key in self._added and key not in self._removed:
+            del self._added[key]  # added by this transaction
+        else:
+            self._added.pop(key, None)
+            self._removed.setdefault(key, record)
+
+    def touch(self, record):
+        """Announce an in-place edit of `record`; call before changing it."""
+        key = id(record)
+        if key not in self._added:
+            self._removed[key] = dict(record)
+            self._added[key] = record
+
+    def changes(self) -> tuple:
+        """(removed, added) records; an edited record appears in both, old and new."""
+        removed, added = [], []
+        keys = list(self._added) + [key for key in self._removed if key not in self._added]
+        for key in keys:
+            before, after = self._removed.get(key), self._added.get(key)
+            if before is not None and after is not None and before == after:
+                continue
+            if before is not None:
+                removed.append(before)
+            if after is not None:
+                added.append(after)
+        return removed, added
+
+    def append(self, record):
+        self._add(record)
+        super().append(record)
+
+    def extend(self, records):
+        records = list(records)
+        for record in records:
+            self._add(record)
+        super().extend(records)
+
+    def __iadd__(self, records):
+        self.extend(records)
+        return self
+
+    def insert(self, index, record):
+        self._add(record)
+        super().insert(index, record)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            for record in self[index]:
+                self._drop(record)
+            for record in value:
+                self._add(record)
+        else:
+            self._drop(self[index])
+            self._add(value)
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        for record in (self[index] if isinstance(index, slice) else [self[index]]):
+            self._drop(record)
+        super().__delitem__(index)
+
+    def pop(self, index=-1):
+        record = super().pop(index)
+        self._drop(record)
+        return record
+
+    def remove(self, record):
+        del self[self.index(record)]
+
+    def clear(self):
+        for record in self:
+            self._drop(record)
+        super().clear()
+
+
+def add_listener(fn):
+    """Call `fn(events)` with the status events of every committed transaction of this process."""
+    _listeners.append(fn)
+
+
+def add_observer(before_fn=None, commit_fn=None, save_fn=None):
+    """
+    Follow every transaction of this process, e.g. to maintain an in-memory
+    index or a table derived from the records.
+
+    `before_fn(data)` runs on the store as loaded, before the transaction body;
+    `save_fn(data, changes)` runs after the body and before the write, and
+    whatever it changes in `data` is saved with the transaction;
+    `commit_fn(state, data, changes)` runs after the write with whatever
+    before_fn returned. `changes` holds the transaction's record changes,
+    {collection: (removed, added)} for each of TRACKED_COLLECTIONS. Every
+    hook is optional; all run under the store lock.
+    """
+    _observers.append((before_fn, commit_fn, save_fn))
+
+
+def _mint_key(mint: Dict[str, Any]) -> tuple:
+    return (mint.get("tx_id"), mint.get("log_index"))
+
+
+def _status_snapshot(data: Dict[str, Any]) -> dict:
+    return {contract_key(c): (c.get("status"), verification_state(c)) for c in data["contracts"]}
+
+
+def _record_events(data: Dict[str, Any], contracts_before: dict, changes: dict) -> List[Dict[str, Any]]:
+    """
+    Append an event for every contract / mint that was created or changed status.
+
+    Contract status is its deployment `status` plus its verification state;
+    a mint's is its verification state (only the mints the transaction
+    changed are looked at). Events get increasing IDs and the store keeps
+    the last EVENT_LOG_SIZE of them.
+    """
+    removed_mints, added_mints = changes["mints"]
+    mints_before = {_mint_key(m): verification_state(m) for m in removed_mints}
+    owners = {str(c.get("contract_address") or "").lower(): c.get("owner") for c in data["contracts"]}
+    now = int(time.time())
+    events = []
+
+    for c in data["contracts"]:
+        previous = contracts_before.get(contract_key(c))
+        current = (c.get("status"), verification_state(c))
+        if previous == current:
+            continue
+        events.append({
+            "type": "contract",
+            "record_id": c.get("cobo_id") or c.get("tx_hash") or c.get("name"),
+            "chain_id": c.get("chain_id"),
+            "contract_address": c.get("contract_address"),
+            "owner": c.get("owner"),
+            "status": current[0],
+            "previous_status": previous[0] if previous else None,
+            "verification": current[1],
+            "previous_verification": previous[1] if previous else None,
+            "time": now,
+        })
+
+    for m in added_mints:
+        key = _mint_key(m)
+        previous = mints_before.get(key)
+        current = verification_state(m)
+        if previous == current:
+            continue
+        events.append({
+            "type": "mint",
+            "record_id": m.get("tx_id"),
+            "chain_id": m.get("chain_id"),
+            "contract_address": m.get("contract_address"),
+            "owner": owners.get(str(m.get("contract_address") or "").lower()),
+            "partition": m.get("partition"),
+            "to_address": m.get("to_address"),
+            "verification": current,
+            "previous_verification": previous,
+            "time": now,
+        })
+
+    if events:
+        next_id = data.get("event_id", 0)
+        for event in events:
+            next_id += 1
+            event["id"] = next_id
+        data["event_id"] = next_id
+        data["events"] = (data.get("events", []) + events)[-EVENT_LOG_SIZE:]
+    return events
+
+
+@contextmanager
+def transaction():
+    """
+    Read-modify-write the whole store under an exclusive lock.
+
+    The yielded dict is written back atomically when the block exits without
+    an exception; on exception nothing is persisted. Mints and transfers are
+    TrackedLists: edit a record in place only after `touch()`ing it, so
+    observers see the change (see add_observer()). Contract changes advance
+    the change sequence (see change_seq()), status transitions are appended
+    to the event log (see add_listener()) and observers may update derived
+    tables before the write (see add_observer()).
+
+        with transaction() as db:
+            db["mints"].append(mint)
+    """
+    with _lock, _file_lock():
+        data = load_db()
+        tracked = {kind: TrackedList(data.get(kind, [])) for kind in TRACKED_COLLECTIONS}
+        for kind, records in tracked.items():
+            if kind in data:
+                data[kind] = records
+        before = [_fingerprint(c) for c in data["contracts"]]
+        statuses = _status_snapshot(data)
+        observed = [before_fn(data) if before_fn else None for before_fn, _, _ in _observers]
+        yield data
+        for kind, records in tracked.items():
+            if data.get(kind) is not records:
+                # The collection was replaced: diff the new list by record identity
+                records[:] = data.get(kind) or []
+                if kind in data:
+                    data[kind] = records
+        changes = {kind: records.changes() for kind, records in tracked.items()}
+        _stamp_changes(data, before)
+        events = _record_events(data, statuses, changes)
+        for _, _, save_fn in _observers:
+            if save_fn:
+                save_fn(data, changes)
+        save_db(data)
+        for (_, commit_fn, _), state in zip(_observers, observed):
+            if not commit_fn:
+                continue
+            try:
+                commit_fn(state, data, changes)
+            except Exception as e:
+                print(f"⚠️ Store observer failed: {e}")
+    if events:
+        for listener in _listeners:
+            try:
+                listener(events)
+            except Exception as e:
+                print(f"⚠️ Event listener failed: {e}")
+
+
+def change_seq(data: Dict[str, Any]) -> int:
+    """The store's contract change sequence (0 before the first tracked change)."""
+    return data.get("seq", 0)
+
+
+def contracts_since(data: Dict[str, Any], since: int) -> List[Dict[str, Any]]:
+    """Contracts added or changed after sequence `since` (every contract for 0)."""
+    if since <= 0:
+        return data["contracts"]
+    return [c for c in data["contracts"] if c.get("seq", 0) > since]
+
+
 def add_contract(contract: Dict[str, Any]):
-    db = load_db()
-    db["contracts"].append(contract)
-    save_db(db)
+    with transaction() as db:
+        db["contracts"].append(contract)
+
+def contract_key(contract: Dict[str, Any]) -> tuple:
+    """Stable identity of a contract record: its Cobo transaction ID, else chain + tx hash."""
+    if contract.get("cobo_id"):
+        return ("cobo", contract["cobo_id"])
+    return ("tx", contract.get("chain_id"), str(contract.get("tx_hash") or "").lower())
+
+def update_contracts(changes: Dict[tuple, Dict[str, Any]]):
+    """
+    Set fields on stored contracts, matched by contract_key(). The fields
+    are applied to the records as they are at write time, so other changes
+    made to them since the caller read the store are kept.
+
+    Args:
+        changes: contract_key() -> {field: new value}
+
+    Returns:
+        int: The change sequence after the write.
+    """
+    if not changes:
+        return change_seq(load_db())
+    with transaction() as db:
+        for c in db["contracts"]:
+            fields = changes.get(contract_key(c))
+            if fields:
+                c.update(fields)
+    return change_seq(db)
+
+# Verification states set by reconcile_data.py
+VERIFICATION_STATES = ("unverified", "pending", "finalized", "invalid")
+
+def verification_state(record: Dict[str, Any]) -> str:
+    """A record's verification state; records from before states existed derive it."""
+    state = record.get("verification")
+    if state in VERIFICATION_STATES:
+        return state
+    return "finalized" if record.get("finalized") else "unverified"
 
 def get_contracts() -> List[Dict[str, Any]]:
     db = load_db()
     return db["contracts"]
 
-def add_mint_event(event: Dict[str, Any]):
+def get_mints() -> List[Dict[str, Any]]:
     db = load_db()
-    if "mints" not in db:
-        db["mints"] = []
-    db["mints"].append(event)
-    save_db(db)
+    return db["mints"]
+
+def add_mint_event(event: Dict[str, Any]):
+    with transaction() as db:
+        db["mints"].append(event)
 
 def get_mint_events(chain_id: str, contract_address: str) -> List[Dict[str, Any]]:
     db = load_db()
     return [
-        m for m in db.get("mints", []) 
+        m for m in db.get("mints", [])
         if m.get("chain_id") == chain_id and m.get("contract_address").lower() == contract_address.lower()
     ]
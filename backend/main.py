@@ -1,14 +1,40 @@
-import uvicorn
 import os
 import json
+import time
+import asyncio
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from web3 import Web3
-from backend.services.cobo_service import cobo_client
+from backend.services import lazy
 from backend.services import rewards_service
+from backend.services import resilience
+from backend.services import ledger
+from backend.services.balance_index import index as balance_index
+from backend.services import payouts
+from backend.services import executors
+from backend.services import single_flight
+from backend.services import artifacts
+from backend.services import events
+from backend.services import issuance
+from backend.services import exports
+from backend.services.serialization import dumps
+from backend.services.serialization import FastJSONResponse, bytes_response
+from backend.services.executors import run_blocking
+from backend.services.resilience import UpstreamUnavailable
+from backend.services.rpc_service import CHAIN_RPC_URLS, get_web3
+from backend.services.confirmations import refresh_confirmations
 from backend.config.settings import settings
+from backend import database
+
+# The Cobo SDK and web3 take seconds to import; defer them to first use so a
+# serverless cold start only pays for what its request needs
+cobo_client = lazy.LazyObject("backend.services.cobo_service", "cobo_client")
+async_cobo_client = lazy.LazyObject("backend.services.async_cobo_service", "async_cobo_client")
+
+# Mints recorded by the API are posted to the issuance rollups as they are written
+issuance.register()
 
 print(f"DEBUG: Cobo URL from settings: {settings.cobo_api_url}")
 print(f"DEBUG: Cobo Key present: {bool(settings.cobo_api_private_key)}")
@@ -19,17 +45,60 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 app = FastAPI(
     title="White-Label Tokenization Platform",
-    root_path="/api" if os.environ.get("VERCEL") else ""
+    root_path="/api" if os.environ.get("VERCEL") else "",
+    default_response_class=FastJSONResponse
 )
 
+@app.middleware("http")
+async def upstream_deadline(request: Request, call_next):
+    """Give every upstream call made for this request a shared deadline.
+
+    Clients may lower the budget with an `X-Request-Timeout` header (seconds).
+    """
+    budget = settings.request_deadline_seconds
+    try:
+        budget = min(budget, float(request.headers.get("x-request-timeout", budget)))
+    except ValueError:
+        pass
+    with resilience.deadline_scope(budget):
+        return await call_next(request)
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "error_type": type(exc).__name__}
+    )
+
+@app.on_event("startup")
+async def warm_up():
+    """Long-running servers load the SDKs up front instead of on the first request."""
+    if settings.lazy_startup:
+        return
+    lazy.preload(cobo_client, async_cobo_client)
+    rewards_service.rewards_abi()
+    get_web3(settings.chain_id)
+    await run_blocking(executors.STORE, artifacts.preload)
+
+@app.on_event("shutdown")
+async def close_upstream_clients():
+    task = _contract_refresh["task"]
+    if task is not None:
+        task.cancel()
+    if lazy.is_loaded(async_cobo_client):
+        await async_cobo_client.aclose()
+    executors.shutdown()
+
 @app.get("/debug")
-def debug_info():
+async def debug_info():
     return {
         "status": "ok",
         "vercel": os.environ.get("VERCEL"),
         "root_path": app.root_path,
         "cwd": os.getcwd(),
-        "path": sys.path
+        "path": sys.path,
+        "executors": executors.executor_stats(),
+        "single_flight": single_flight.stats()
     }
 
 # --- 2. CORS Configuration (CRITICAL) ---
@@ -51,82 +120,125 @@ app.add_middleware(
 
 # --- 3. Database Mock (File Persistence) ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-if os.environ.get("VERCEL"):
-    DB_FILE = "/tmp/db.json"
-    # Copy initial db.json to /tmp if it doesn't exist
-    if not os.path.exists(DB_FILE):
-        import shutil
-        initial_db = os.path.join(BASE_DIR, "db.json")
-        if os.path.exists(initial_db):
-            try:
-                shutil.copy(initial_db, DB_FILE)
-                print(f"DEBUG: Copied {initial_db} to {DB_FILE}")
-            except Exception as e:
-                print(f"DEBUG: Failed to copy db.json: {e}")
-else:
-    DB_FILE = os.path.join(BASE_DIR, "db.json")
+DB_FILE = database.DB_FILE
 
 def get_contracts():
     """Safe read of the DB file."""
-    if not os.path.exists(DB_FILE):
-        return []
     try:
-        with open(DB_FILE, "r") as f:
-            data = json.load(f)
-            # Handle both list (legacy) and dict (new) formats
-            if isinstance(data, list):
-                return data
-            return data.get("contracts", [])
+        return database.get_contracts()
     except Exception:
         return []
 
+def load_store():
+    """Safe read of the whole DB file."""
+    try:
+        return database.load_db()
+    except Exception:
+        return {"contracts": [], "mints": []}
+
 def resolve_contract_address(tx_hash: str, chain_id: str = "BSC_BNB") -> Optional[str]:
     """Fetches the contract address from the transaction receipt."""
     try:
-        # Determine RPC URL based on chain_id
-        rpc_url = "https://bsc-dataseed.binance.org/" # Default to BSC
-        if chain_id == "ETH_SEPOLIA":
-             rpc_url = "https://rpc.sepolia.org"
-        elif chain_id == "MATIC_POLYGON":
-             rpc_url = "https://polygon-rpc.com"
-        
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        # Unknown chains default to BSC
+        w3 = get_web3(chain_id if chain_id in CHAIN_RPC_URLS else "BSC_BNB")
         receipt = w3.eth.get_transaction_receipt(tx_hash)
         return receipt.get("contractAddress")
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         print(f"Error fetching receipt for {tx_hash}: {e}")
         return None
 
 def get_mints():
     """Safe read of mints from DB file."""
-    if not os.path.exists(DB_FILE):
-        return []
     try:
-        with open(DB_FILE, "r") as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return []
-            return data.get("mints", [])
+        return database.get_mints()
     except Exception:
         return []
 
 def save_contract(contract_data):
     """Safe write to the DB file."""
-    if not os.path.exists(DB_FILE):
-        data = {"contracts": [], "mints": []}
-    else:
+    database.add_contract(contract_data)
+
+def load_artifact():
+    """Load the SimpleERC1400 ABI and bytecode."""
+    abi_path = os.path.join(BASE_DIR, "artifacts", "SimpleERC1400.json")
+    with open(abi_path, "r") as f:
+        return json.load(f)
+
+async def artifact_response(request: Request, name: str, v: Optional[str] = None):
+    """
+    Serve an artifact from memory, compressed if the client accepts it.
+
+    Revalidation with If-None-Match answers 304. A URL pinned to the
+    current version (`?v=<ETag hash>`) may be cached as immutable; the
+    plain URL must be revalidated, since a redeploy can change it.
+    """
+    try:
+        artifact = artifacts.cached_artifact(name)
+        if artifact is None:
+            artifact = await run_blocking(executors.STORE, artifacts.get_artifact, name)
+    except artifacts.ArtifactNotFound:
+        raise HTTPException(status_code=404, detail="Artifacts not found")
+
+    version = artifact["version"]
+    encoding = artifacts.choose_encoding(request.headers.get("accept-encoding"), artifact["encodings"])
+    headers = {
+        "ETag": artifacts.etag(version, encoding),
+        "Cache-Control": artifacts.IMMUTABLE_CACHE_CONTROL if v == version else artifacts.REVALIDATE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if artifacts.not_modified(request.headers.get("if-none-match"), version):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return bytes_response(artifact["encodings"][encoding], headers=headers)
+
+def track_confirmations(chain_id: str, contracts: list) -> list:
+    """
+    Refresh confirmations of one chain's deployments.
+
+    Works on copies: if a lookup fails, the chain is skipped for this pass
+    and every record is left as it was.
+
+    Returns:
+        list: Refreshed copies of the records that changed.
+    """
+    updated = []
+    try:
+        head = get_web3(chain_id).eth.block_number
+        for c in contracts:
+            refreshed = dict(c)
+            if refresh_confirmations(refreshed, chain_id, c.get("tx_hash"), head=head):
+                updated.append(refreshed)
+    except UpstreamUnavailable as e:
+        print(f"Skipping confirmation tracking on {chain_id}: {e}")
+        return []
+    except Exception as e:
+        print(f"Failed to refresh confirmations on {chain_id}: {e}")
+        return []
+    return updated
+
+def find_wallet_by_address(address: str, api_chain_id: str):
+    """Search every Cobo wallet for the one controlling `address`. Returns its details or None."""
+    for wallet in cobo_client.iter_wallets():
+        wallet_data = wallet.actual_instance
+        wallet_id = wallet_data.wallet_id
+
         try:
-            with open(DB_FILE, "r") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    data = {"contracts": data, "mints": []}
-        except Exception:
-            data = {"contracts": [], "mints": []}
-    
-    data["contracts"].append(contract_data)
-    
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+            wallet_address = cobo_client.get_wallet_address(wallet_id, api_chain_id)
+            if wallet_address and wallet_address.lower() == address.lower():
+                return {
+                    "status": "success",
+                    "wallet_id": wallet_id,
+                    "address": wallet_address,
+                    "wallet_name": wallet_data.name
+                }
+        except UpstreamUnavailable:
+            raise
+        except:
+            continue
+    return None
 
 # --- 4. Pydantic Models ---
 class DeployRequest(BaseModel):
@@ -196,26 +308,36 @@ class DelegateTokensRequest(BaseModel):
     wallet_id: str
     chain_id: str = "ETH_SEPOLIA"
 
+class SimulatePayoutsRequest(BaseModel):
+    contract_address: str
+    amount: int
+    chain_id: str = "ETH_SEPOLIA"
+    block: Optional[int] = None
+
 
 
 # --- 5. API Endpoints (ALIGNED WITH FRONTEND) ---
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"status": "ok", "message": "API is Live"}
 
-# FIX: Renamed from /contracts to /tokens to match Frontend
-@app.get("/tokens")
-def list_tokens():
-    contracts = get_contracts()
-    
+async def refresh_contracts(contracts: list, seq: int) -> int:
+    """
+    Resolve pending deployments and track confirmations, writing back what changed.
+
+    Returns:
+        int: The store's change sequence afterwards.
+    """
+    loaded = [dict(c) for c in contracts]
+
     # Check for pending contracts and resolve address
     updated = False
     for c in contracts:
         if c.get("status") == "Pending" and c.get("cobo_id"):
             try:
                 print(f"Checking status for pending contract {c['name']} (Cobo ID: {c['cobo_id']})...")
-                tx_details = cobo_client.get_transaction(c['cobo_id'])
+                tx_details = await async_cobo_client.get_transaction(c['cobo_id'])
                 
                 if tx_details and (str(tx_details.status) == "TransactionStatus.COMPLETED" or str(tx_details.status) == "TransactionStatus.CONFIRMED" or str(tx_details.status) == "TransactionStatus.SUCCESS"):
                     # Transaction confirmed by Cobo. Now get on-chain address.
@@ -228,7 +350,9 @@ def list_tokens():
                     c["tx_hash"] = chain_tx_hash
                     
                     # Resolve Contract Address
-                    real_address = resolve_contract_address(chain_tx_hash, c.get("chain_id", "BSC_BNB"))
+                    real_address = await run_blocking(
+                        executors.RPC, resolve_contract_address, chain_tx_hash, c.get("chain_id", "BSC_BNB")
+                    )
                     if real_address:
                         c["contract_address"] = real_address
                         print(f"✅ Resolved Contract Address: {real_address}")
@@ -244,29 +368,158 @@ def list_tokens():
                 elif tx_details and str(tx_details.status) == "TransactionStatus.FAILED":
                      c["status"] = "Failed"
                      updated = True
+            except UpstreamUnavailable as e:
+                # Upstream is degraded; serve what we have instead of waiting on every record
+                print(f"Skipping pending resolution: {e}")
+                break
             except Exception as e:
                 print(f"Failed to resolve contract: {e}")
 
+    # Track confirmations of deployments until they reach the chain's finality depth,
+    # one chain per RPC worker
+    by_chain = {}
+    for c in contracts:
+        chain_id = c.get("chain_id")
+        if c.get("status") != "Deployed" or c.get("finalized") or chain_id not in CHAIN_RPC_URLS:
+            continue
+        if database.verification_state(c) == "invalid":
+            continue
+        by_chain.setdefault(chain_id, []).append(c)
+    tracked = await asyncio.gather(*(
+        run_blocking(executors.RPC, track_confirmations, chain_id, chain_contracts)
+        for chain_id, chain_contracts in by_chain.items()
+    ))
+    refreshed = {database.contract_key(c): c for chain_updates in tracked for c in chain_updates}
+    for c in contracts:
+        c.update(refreshed.get(database.contract_key(c), {}))
+    updated = updated or bool(refreshed)
+
     if updated:
-        # Save back to DB
-        # We need to load fresh, update, save.
-        # But here we modified 'contracts' list which is from get_contracts()
-        # We need to save the whole structure.
-        # get_contracts returns list, we need to wrap in dict
-        data = {"contracts": contracts, "mints": get_mints()} # get_mints is not efficient here, better load raw
-        # Re-implement save logic safely
-        with open(DB_FILE, "r") as f:
-            full_data = json.load(f)
-        full_data["contracts"] = contracts
-        with open(DB_FILE, "w") as f:
-            json.dump(full_data, f, indent=2)
-
-    return contracts
+        # Write back only the fields this pass changed: the lookups above are
+        # slow, and other writers (deploys, indexer, reconciliation) may have
+        # changed the stored records meanwhile.
+        changes = {}
+        for before, c in zip(loaded, contracts):
+            fields = {k: v for k, v in c.items() if k not in before or before[k] != v}
+            if fields:
+                changes[database.contract_key(before)] = fields
+        seq = await run_blocking(executors.STORE, database.update_contracts, changes)
+
+    return seq
+
+_contract_refresh = {"task": None, "at": 0.0}
+
+async def refresh_stored_contracts():
+    try:
+        data = await run_blocking(executors.STORE, load_store)
+        await refresh_contracts(data["contracts"], database.change_seq(data))
+    except Exception as e:
+        print(f"Background contract refresh failed: {e}")
+
+def schedule_contract_refresh():
+    """
+    Run refresh_contracts in the background: the Cobo and RPC lookups stay
+    off the request path, and polling clients pick up what it writes on
+    their next request. One refresh at a time, at most one per
+    contract_refresh_interval.
+    """
+    task = _contract_refresh["task"]
+    if task is not None and not task.done():
+        return
+    now = time.monotonic()
+    if now - _contract_refresh["at"] < settings.contract_refresh_interval:
+        return
+    _contract_refresh["at"] = now
+    _contract_refresh["task"] = asyncio.create_task(refresh_stored_contracts())
+
+def tokens_version(seq: int) -> str:
+    return f"tokens-{seq}"
+
+# FIX: Renamed from /contracts to /tokens to match Frontend
+@app.get("/tokens")
+async def list_tokens(request: Request):
+    """
+    Every contract. The ETag follows the store's change sequence, so a
+    client polling with If-None-Match gets a 304 while nothing changed.
+    Pending deployments and confirmations are refreshed in the background.
+    """
+    schedule_contract_refresh()
+    data = await run_blocking(executors.STORE, load_store)
+    version = tokens_version(database.change_seq(data))
+    headers = {"ETag": artifacts.etag(version, "identity"), "Cache-Control": "no-cache"}
+    if artifacts.not_modified(request.headers.get("if-none-match"), version):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(data["contracts"], headers=headers)
+
+@app.get("/tokens/changes")
+async def list_token_changes(since: int = 0):
+    """
+    Delta sync: contracts added or changed after change sequence `since`.
+
+    Poll with the returned `seq`; `since=0` returns every contract.
+    """
+    schedule_contract_refresh()
+    data = await run_blocking(executors.STORE, load_store)
+    return FastJSONResponse({
+        "seq": database.change_seq(data),
+        "contracts": database.contracts_since(data, since),
+    })
+
+@app.get("/events")
+async def stream_events(
+    request: Request,
+    chain_id: Optional[str] = None,
+    contract: Optional[str] = None,
+    owner: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[int] = None
+):
+    """
+    Server-Sent Events stream of contract and mint status transitions.
+
+    Filters: `chain_id`, `contract` (address) and `owner` (contract owner).
+    Reconnecting EventSource clients resume after their Last-Event-ID;
+    `since` does the same for a first connection. If the events a client
+    missed have been dropped from the log, it receives a `reset` event and
+    should refetch /tokens.
+    """
+    await run_blocking(executors.STORE, events.hub.refresh)
+    try:
+        cursor = int(last_event_id) if last_event_id else since
+    except ValueError:
+        cursor = None
+    if cursor is None:
+        cursor = events.hub.last_id()
+
+    async def stream():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            changed = events.hub.changed()
+            pending, complete = events.hub.since(cursor)
+            if not complete:
+                yield f"event: reset\ndata: {{\"last_id\": {events.hub.last_id()}}}\n\n"
+            for event in pending:
+                cursor = event["id"]
+                if events.matches(event, chain_id, contract, owner):
+                    yield f"id: {event['id']}\nevent: {event['type']}\ndata: {dumps(event).decode()}\n\n"
+            if pending:
+                continue
+            if not await events.hub.wait(changed):
+                # Idle: keep the connection open and look for other processes' writes
+                yield ": keepalive\n\n"
+                await run_blocking(executors.STORE, events.hub.refresh)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # FIX: Renamed from /deploy to /tokens/deploy to match Frontend
 # FIX: Renamed from /deploy to /tokens/deploy to match Frontend
 @app.post("/tokens/deploy")
-def deploy_token(req: DeployRequest):
+async def deploy_token(req: DeployRequest):
     print(f"🚀 Deploying {req.name}...")
     
     # Mocking successful deployment for MVP
@@ -277,10 +530,9 @@ def deploy_token(req: DeployRequest):
     if True: # We want to try Cobo for all deployments in this context, or check a flag
         try:
             # Load ABI/Bytecode
-            abi_path = os.path.join(BASE_DIR, "artifacts", "SimpleERC1400.json")
-            with open(abi_path, "r") as f:
-                artifact = json.load(f)
+            artifact = await run_blocking(executors.STORE, load_artifact)
             
+            from web3 import Web3
             w3 = Web3()
             contract = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
             
@@ -290,7 +542,7 @@ def deploy_token(req: DeployRequest):
             
             # Use the Cobo wallet address as owner so it can mint tokens
             target_wallet_id = settings.cobo_default_wallet_id
-            owner_address = cobo_client.get_wallet_address(target_wallet_id, req.chain_id if req.chain_id != "MATIC_POLYGON" else "MATIC")
+            owner_address = await async_cobo_client.get_wallet_address(target_wallet_id, req.chain_id if req.chain_id != "MATIC_POLYGON" else "MATIC")
             
             # Build constructor transaction to get data
             tx = contract.constructor(
@@ -315,7 +567,7 @@ def deploy_token(req: DeployRequest):
             target_wallet_id = settings.cobo_default_wallet_id
             
             print(f"🚀 Sending Deployment TX to Cobo using wallet {target_wallet_id}...")
-            cobo_tx_id = cobo_client.deploy_contract(
+            cobo_tx_id = await async_cobo_client.deploy_contract(
                 chain_id=req.chain_id,
                 wallet_id=target_wallet_id,
                 bytecode=bytecode_with_args
@@ -351,11 +603,11 @@ def deploy_token(req: DeployRequest):
         "tx_hash": fake_tx,
         "cobo_id": cobo_id
     }
-    save_contract(new_contract)
+    await run_blocking(executors.STORE, save_contract, new_contract)
     return {"status": "success", "address": fake_address, "tx_id": fake_tx}
 
 @app.post("/tokens/register")
-def register_token(req: RegisterTokenRequest):
+async def register_token(req: RegisterTokenRequest):
     """Registers a self-custody token in the database."""
     new_contract = {
         "name": req.name,
@@ -369,11 +621,11 @@ def register_token(req: RegisterTokenRequest):
         "tx_hash": req.tx_hash,
         "cobo_id": None
     }
-    save_contract(new_contract)
+    await run_blocking(executors.STORE, save_contract, new_contract)
     return {"status": "success"}
 
 @app.post("/tokens/mint/register")
-def register_mint(req: RegisterMintRequest):
+async def register_mint(req: RegisterMintRequest):
     """Registers a self-custody mint in the database."""
     new_mint = {
         "chain_id": req.chain_id,
@@ -382,35 +634,18 @@ def register_mint(req: RegisterMintRequest):
         "to_address": req.to_address,
         "amount": req.amount,
         "tx_id": req.tx_hash,
-        "timestamp": 1732720000 # Mock timestamp
+        "timestamp": int(time.time())  # Submission time; the indexer replaces it with the block time
     }
     
     # Save mint to DB
-    if os.path.exists(DB_FILE):
-        try:
-            with open(DB_FILE, "r") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    data = {"contracts": data, "mints": []}
-        except Exception:
-            data = {"contracts": [], "mints": []}
-    else:
-        data = {"contracts": [], "mints": []}
-        
-    if "mints" not in data:
-        data["mints"] = []
-        
-    data["mints"].append(new_mint)
-    
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await run_blocking(executors.STORE, database.add_mint_event, new_mint)
 
     return {"status": "success"}
 
 # FIX: Renamed from /mint to /tokens/mint to match Frontend
 # FIX: Renamed from /mint to /tokens/mint to match Frontend
 @app.post("/tokens/mint")
-def mint_tokens(req: MintRequest):
+async def mint_tokens(req: MintRequest):
     print(f"🚀 Minting {req.amount} tokens to {req.to_address}...")
     
     # Check if contract address is valid
@@ -427,16 +662,15 @@ def mint_tokens(req: MintRequest):
     tx_id = f"mock_mint_{os.urandom(4).hex()}"
     
     # 1. Find contract to check type and get wallet_id
-    contracts = get_contracts()
+    contracts = await run_blocking(executors.STORE, get_contracts)
     contract = next((c for c in contracts if c["contract_address"].lower() == req.contract_address.lower()), None)
     
     if contract and contract.get("type") == "MANAGED":
         try:
             # Load ABI
-            abi_path = os.path.join(BASE_DIR, "artifacts", "SimpleERC1400.json")
-            with open(abi_path, "r") as f:
-                artifact = json.load(f)
+            artifact = await run_blocking(executors.STORE, load_artifact)
             
+            from web3 import Web3
             w3 = Web3()
             contract_instance = w3.eth.contract(abi=artifact["abi"])
             
@@ -461,7 +695,7 @@ def mint_tokens(req: MintRequest):
             
             # Call Cobo
             print(f"🚀 Sending Mint TX to Cobo for {req.contract_address}...")
-            cobo_tx_id = cobo_client.create_contract_call(
+            cobo_tx_id = await async_cobo_client.create_contract_call(
                 chain_id=req.chain_id,
                 wallet_id=contract.get("wallet_id", settings.cobo_default_wallet_id), # Use default wallet
                 to_address=req.contract_address,
@@ -492,129 +726,259 @@ def mint_tokens(req: MintRequest):
         "to_address": req.to_address,
         "amount": req.amount,
         "tx_id": tx_id,
-        "timestamp": 1732720000 # Mock timestamp
+        "timestamp": int(time.time())  # Submission time; the indexer replaces it with the block time
     }
     
     # Save mint to DB
-    if os.path.exists(DB_FILE):
-        try:
-            with open(DB_FILE, "r") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    data = {"contracts": data, "mints": []}
-        except Exception:
-            data = {"contracts": [], "mints": []}
-    else:
-        data = {"contracts": [], "mints": []}
-        
-    if "mints" not in data:
-        data["mints"] = []
-        
-    data["mints"].append(new_mint)
-    
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await run_blocking(executors.STORE, database.add_mint_event, new_mint)
 
     return {"status": "success", "tx_hash": tx_id}
 
 # FIX: Renamed from /set-document to /tokens/document to match Frontend
 @app.post("/tokens/document")
-def set_document(req: DocumentRequest):
+async def set_document(req: DocumentRequest):
     return {"status": "success", "tx_hash": "0xMockDocHash"}
 
 @app.get("/tokens/{chain_id}/{address}/holders")
-def get_token_holders(chain_id: str, address: str):
-    mints = get_mints()
-    
-    # Filter mints for this token
-    token_mints = [
-        m for m in mints 
-        if m.get("chain_id") == chain_id and m.get("contract_address").lower() == address.lower()
-    ]
-    
-    # Aggregate balances
-    balances = {}
-    for mint in token_mints:
-        key = (mint["to_address"], mint["partition"])
-        if key not in balances:
-            balances[key] = 0
-        balances[key] += mint["amount"]
-        
-    # Format response
-    holders = []
-    for (wallet, partition), balance in balances.items():
-        if balance > 0:
-            holders.append({
-                "address": wallet,
-                "partition": partition,
-                "balance": balance
-            })
-            
-            
-    return holders
+async def get_token_holders(chain_id: str, address: str, block: Optional[int] = None):
+    """
+    Per-partition balances from indexed mints and transfers (no RPC).
+    With `block`, balances as of the end of that block.
+    """
+    if block is not None:
+        holders = await run_blocking(executors.STORE, ledger.get_holders_at, chain_id, address, block)
+    else:
+        holders = await run_blocking(executors.STORE, ledger.get_holders, chain_id, address)
+    return FastJSONResponse(holders)
+
+@app.get("/tokens/{chain_id}/{address}/snapshot")
+async def export_snapshot(chain_id: str, address: str, block: Optional[int] = None):
+    """
+    Bulk cap-table export at a block.
+
+    Without `block`, the token's on-chain snapshotBlock is used and the
+    ledger total is compared with its totalSnapshotSupply.
+    """
+    onchain = None
+    if block is None:
+        try:
+            onchain = await rewards_service.aget_rewards_info(address, chain_id)
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"No block given and snapshot info unavailable: {e}")
+        block = onchain["snapshotBlock"]
+
+    result = await run_blocking(executors.STORE, ledger.snapshot, chain_id, address, block)
+    if onchain is not None:
+        result["total_snapshot_supply"] = onchain["totalSnapshotSupply"]
+        result["matches_onchain"] = result["total_supply"] == onchain["totalSnapshotSupply"]
+    return FastJSONResponse(result)
+
+@app.get("/tokens/{chain_id}/{address}/stats")
+async def get_token_stats(chain_id: str, address: str, top: int = 10):
+    """
+    Cap-table analytics per partition: issued, outstanding supply, holder
+    count and concentration (top holders, largest holder's share). Read
+    from rollups kept up to date on ingest, not computed from the holders.
+    """
+    stats = await run_blocking(executors.STORE, balance_index.token_stats, chain_id, address, top)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Token not found")
+
+    for p in stats["partitions"]:
+        supply = p["supply"]
+        p["top_holders"] = [
+            {
+                "address": balance_index.display.get(holder, holder),
+                "balance": ledger.to_token_units(value),
+                "value": str(value),
+                "share": value / supply if supply > 0 else 0.0,
+            }
+            for holder, value in p["top_holders"]
+        ]
+        p["issued"] = str(p["issued"])
+        p["supply"] = str(supply)
+    return FastJSONResponse({"chain_id": chain_id, "contract_address": address, **stats})
+
+@app.get("/tokens/{chain_id}/{address}/history")
+async def get_issuance_history(chain_id: str, address: str, bucket: str = "day"):
+    """
+    Issued amount, mint count and cumulative issuance per hour, day or week,
+    per partition and in total. Read from the issuance rollups, not the mints.
+    """
+    try:
+        history = await run_blocking(executors.STORE, issuance.history, chain_id, address, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"chain_id": chain_id, "contract_address": address, "bucket": bucket, **history})
+
+@app.get("/tokens/{chain_id}/{address}/export")
+async def export_token(
+    chain_id: str,
+    address: str,
+    request: Request,
+    format: str = "csv",
+    dataset: str = "holders",
+):
+    """
+    Full cap table (`dataset=holders`) or mint history (`dataset=mints`) as
+    CSV or NDJSON, streamed in chunks; gzipped if the client accepts it.
+    """
+    compress = artifacts.choose_encoding(request.headers.get("accept-encoding"), ("gzip",)) == "gzip"
+    try:
+        chunks = exports.export_chunks(chain_id, address, dataset, format, compress)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        # Rows are produced by store reads: keep them on the bounded store executor
+        while True:
+            chunk = await run_blocking(executors.STORE, next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{chain_id}-{address}-{dataset}.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(stream(), media_type=exports.FORMATS[format], headers=headers)
+
+@app.get("/holders/{address}/portfolio")
+async def get_portfolio(address: str, claimable: bool = False):
+    """
+    Everything an address holds across our tokens, from the holder index.
+
+    With `claimable`, each token's claimable / claimed rewards are added
+    (cached for a short time; `null` while the chain RPC is unavailable).
+    """
+    positions = await run_blocking(executors.STORE, balance_index.portfolio, address)
+    for p in positions:
+        p["balance"] = ledger.to_token_units(p["value"])
+        p["value"] = str(p["value"])
+
+    rewards = {}
+    if claimable:
+        tokens = sorted({(p["chain_id"], p["contract_address"]) for p in positions})
+
+        async def lookup(chain_id, contract_address):
+            try:
+                return await rewards_service.cached_claimable(contract_address, address, chain_id)
+            except UpstreamUnavailable:
+                return None
+
+        results = await asyncio.gather(*(lookup(chain_id, contract) for chain_id, contract in tokens))
+        rewards = dict(zip(tokens, results))
+        for p in positions:
+            p["claimable"] = rewards[(p["chain_id"], p["contract_address"])]
+
+    return FastJSONResponse({
+        "address": balance_index.display.get(address.lower(), address),
+        "positions": positions,
+        "token_count": len({(p["chain_id"], p["contract_address"]) for p in positions}),
+    })
 
 @app.get("/artifacts")
-def get_artifacts():
+async def get_artifacts(request: Request, v: Optional[str] = None):
     """Returns the ABI and Bytecode for the token contract."""
-    abi_path = os.path.join(BASE_DIR, "artifacts", "SimpleERC1400.json")
-    if not os.path.exists(abi_path):
-        raise HTTPException(status_code=404, detail="Artifacts not found")
-        
-    with open(abi_path, "r") as f:
-        return json.load(f)
+    return await artifact_response(request, artifacts.DEFAULT_ARTIFACT, v)
+
+@app.get("/artifacts/{name}")
+async def get_artifact_by_name(name: str, request: Request, v: Optional[str] = None):
+    """Returns any artifact in backend/artifacts by name (e.g. CoboERC20TestVotesABI)."""
+    return await artifact_response(request, name, v)
 
 # --- Rewards Distribution Endpoints ---
 
 @app.get("/rewards/info/{contract_address}")
-def get_rewards_info(contract_address: str, chain_id: str = "ETH_SEPOLIA"):
+async def get_rewards_info(contract_address: str, chain_id: str = "ETH_SEPOLIA"):
     """Get rewards contract configuration and status."""
     try:
-        info = rewards_service.get_rewards_info(contract_address, chain_id)
+        info = await rewards_service.aget_rewards_info(contract_address, chain_id)
         return {"status": "success", "data": info}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/rewards/claimable/{contract_address}/{investor_address}")
-def get_claimable_rewards(contract_address: str, investor_address: str, chain_id: str = "ETH_SEPOLIA"):
+async def get_claimable_rewards(contract_address: str, investor_address: str, chain_id: str = "ETH_SEPOLIA"):
     """Get claimable rewards for an investor."""
     try:
-        result = rewards_service.get_claimable(contract_address, investor_address, chain_id)
+        result = await rewards_service.aget_claimable(contract_address, investor_address, chain_id)
         return {"status": "success", "data": result}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/rewards/set-reward-token")
-def set_reward_token(req: SetRewardTokenRequest):
+async def set_reward_token(req: SetRewardTokenRequest):
     """Set the reward token address (Issuer only - requires MANAGER_ROLE)."""
     try:
-        tx_id = rewards_service.set_reward_token(
+        tx_id = await run_blocking(
+            executors.COBO,
+            rewards_service.set_reward_token,
             req.contract_address,
             req.reward_token_address,
             req.wallet_id,
             req.chain_id
         )
         return {"status": "success", "tx_id": tx_id}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/rewards/take-snapshot")
-def take_snapshot(request: dict):
+async def take_snapshot(request: dict):
     """Take a snapshot of token holders (Issuer only - requires MANAGER_ROLE)."""
     try:
         contract_address = request.get("contract_address")
         wallet_id = request.get("wallet_id")
         chain_id = request.get("chain_id", "ETH_SEPOLIA")
         
-        tx_id = rewards_service.take_snapshot(contract_address, wallet_id, chain_id)
+        tx_id = await run_blocking(executors.COBO, rewards_service.take_snapshot, contract_address, wallet_id, chain_id)
         return {"status": "success", "tx_id": tx_id}
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/rewards/simulate")
+async def simulate_payouts(req: SimulatePayoutsRequest):
+    """
+    Expected payout per investor for a deposit, from the local ledger.
+
+    Without `block`, the contract's snapshotBlock and totalSnapshotSupply are
+    used, so the result matches what claimable() will return after deposit.
+    """
+    try:
+        total_supply = None
+        block = req.block
+        if block is None:
+            info = await rewards_service.aget_rewards_info(req.contract_address, req.chain_id)
+            block = info["snapshotBlock"]
+            total_supply = int(info["totalSnapshotSupply"])
+        result = await run_blocking(
+            executors.STORE, payouts.simulate, req.chain_id, req.contract_address, req.amount, block, total_supply
+        )
+        return {"status": "success", "data": result}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/rewards/deposit")
-def deposit_rewards(req: DepositRewardsRequest):
+async def deposit_rewards(req: DepositRewardsRequest):
     """Deposit rewards to the contract (Issuer only - requires MANAGER_ROLE)."""
     try:
-        result = rewards_service.deposit_rewards(
+        result = await run_blocking(
+            executors.COBO,
+            rewards_service.deposit_rewards,
             req.contract_address,
             req.amount,
             req.wallet_id,
@@ -622,63 +986,58 @@ def deposit_rewards(req: DepositRewardsRequest):
             req.auto_approve
         )
         return {"status": "success", "data": result}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/rewards/claim")
-def claim_rewards(req: ClaimRewardsRequest):
+async def claim_rewards(req: ClaimRewardsRequest):
     """Claim rewards for the investor."""
     try:
-        tx_id = rewards_service.claim_rewards(
+        tx_id = await run_blocking(
+            executors.COBO,
+            rewards_service.claim_rewards,
             req.contract_address,
             req.wallet_id,
             req.chain_id
         )
         return {"status": "success", "tx_id": tx_id}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/rewards/delegate")
-def delegate_tokens(req: DelegateTokensRequest):
+async def delegate_tokens(req: DelegateTokensRequest):
     """Delegate voting power for ERC20Votes tokens (required for snapshot eligibility)."""
     try:
-        tx_id = rewards_service.delegate_tokens(
+        tx_id = await run_blocking(
+            executors.COBO,
+            rewards_service.delegate_tokens,
             req.token_contract_address,
             req.delegatee_address,
             req.wallet_id,
             req.chain_id
         )
         return {"status": "success", "tx_id": tx_id}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/wallets/find-by-address/{address}")
-def get_wallet_id_by_address(address: str, chain_id: str = "ETH_SEPOLIA"):
+async def get_wallet_id_by_address(address: str, chain_id: str = "ETH_SEPOLIA"):
     """Find the Cobo wallet ID that controls a given address."""
     try:
-        # Get all wallets using cobo_client
-        wallets = cobo_client.get_wallets(limit=50)
-        
         # Map chain ID
         from backend.services.rewards_service import map_chain_id
         api_chain_id = map_chain_id(chain_id)
         
-        # Search for wallet with this address
-        for wallet in wallets:
-            wallet_data = wallet.actual_instance
-            wallet_id = wallet_data.wallet_id
-            
-            try:
-                wallet_address = cobo_client.get_wallet_address(wallet_id, api_chain_id)
-                if wallet_address and wallet_address.lower() == address.lower():
-                    return {
-                        "status": "success",
-                        "wallet_id": wallet_id,
-                        "address": wallet_address,
-                        "wallet_name": wallet_data.name
-                    }
-            except:
-                continue
+        # Stream all wallets page by page on a Cobo worker
+        found = await run_blocking(executors.COBO, find_wallet_by_address, address, api_chain_id)
+        if found:
+            return found
         
         # Not found - return default wallet ID
         return {
@@ -686,10 +1045,13 @@ def get_wallet_id_by_address(address: str, chain_id: str = "ETH_SEPOLIA"):
             "wallet_id": "896d80b5-e653-4941-a906-ea55f28503e1",  # Default
             "message": f"Address {address} not found in Cobo wallets. Using default wallet ID."
         }
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 # --- 6. Local Development Server ---
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Contract artifacts (ABI / bytecode JSON files) served from memory.
+
+Each artifact is read once per file version and kept as pre-encoded bytes
+plus gzip and brotli variants, built at startup (preload) or, for a file
+that changed since, in a worker thread: compressing at the highest levels
+takes tens of milliseconds, too long for the event loop. Every variant carries a strong ETag derived from the content hash, so browsers
+revalidate with a 304 instead of downloading the bytecode again; a request
+that pins the version (`?v=<hash>`) is cacheable as immutable.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import brotli
+from backend.services.serialization import dumps
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts")
+DEFAULT_ARTIFACT = "SimpleERC1400"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+_artifacts = {}  # name -> (mtime_ns, artifact)
+_lock = threading.Lock()
+
+
+class ArtifactNotFound(Exception):
+    pass
+
+
+def _build(path: str) -> dict:
+    with open(path, "rb") as f:
+        raw = f.read()
+    # Re-encode compactly (the files on disk are indented)
+    body = dumps(json.loads(raw))
+    version = hashlib.sha256(body).hexdigest()[:32]
+    encodings = {
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+        "br": brotli.compress(body, quality=11),
+    }
+    return {"version": version, "encodings": encodings}
+
+
+def _locate(name: str):
+    """(name, path, mtime) of an artifact file; raises ArtifactNotFound."""
+    name = name[:-5] if name.endswith(".json") else name
+    # Plain file names only: no path traversal out of ARTIFACTS_DIR
+    if not name or os.path.basename(name) != name or name.startswith("."):
+        raise ArtifactNotFound(name)
+    path = os.path.join(ARTIFACTS_DIR, f"{name}.json")
+    try:
+        return name, path, os.stat(path).st_mtime_ns
+    except OSError:
+        raise ArtifactNotFound(name)
+
+
+def cached_artifact(name: str):
+    """
+    An artifact's encoded variants if they are built and current, else None
+    (build them with get_artifact). Cheap enough for the event loop.
+    """
+    name, _, mtime = _locate(name)
+    cached = _artifacts.get(name)
+    return cached[1] if cached is not None and cached[0] == mtime else None
+
+
+def get_artifact(name: str) -> dict:
+    """
+    An artifact's encoded variants, rebuilt only when its file changes.
+
+    Args:
+        name: File name in backend/artifacts, with or without `.json`.
+
+    Returns:
+        dict: {'version': content hash, 'encodings': {encoding: bytes}}
+    """
+    name, path, mtime = _locate(name)
+    cached = _artifacts.get(name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _lock:
+        cached = _artifacts.get(name)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, _build(path))
+            _artifacts[name] = cached
+    return cached[1]
+
+
+def preload():
+    """Build every artifact in ARTIFACTS_DIR."""
+    for file_name in sorted(os.listdir(ARTIFACTS_DIR)):
+        if file_name.endswith(".json"):
+            get_artifact(file_name)
+
+
+def etag(version: str, encoding: str) -> str:
+    """Strong ETag of one encoded variant (variants differ byte-wise, so their tags do too)."""
+    return f'"{version}"' if encoding == "identity" else f'"{version}-{encoding}"'
+
+
+def not_modified(if_none_match: str, version: str) -> bool:
+    """
+    Whether an If-None-Match header names any variant of this version: the
+    tag itself or one with an encoding suffix ("<version>-gzip"), weak
+    (W/) or strong, alone or in a list.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == version or tag.startswith(f"{version}-"):
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Best of br / gzip the client accepts (q > 0), else identity."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
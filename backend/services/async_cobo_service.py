@@ -0,0 +1,293 @@
+"""
+Asyncio-native Cobo WaaS 2.0 client.
+
+Mirrors the CoboClient call surface (get_transaction, create_contract_call,
+deploy_contract, list_addresses, estimate_fee) for `async def` endpoints.
+Requests are built, signed and deserialized by the cobo_waas2 SDK itself;
+only the transport is swapped for a pooled aiohttp session, so many Cobo
+calls can be in flight at once without tying up threadpool workers.
+"""
+
+import asyncio
+import json
+import threading
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+import aiohttp
+import cobo_waas2
+from cobo_waas2.api import wallets_api, transactions_api
+from cobo_waas2.crypto.local_ed25519_signer import LocalEd25519Signer
+from cobo_waas2.crypto.signing_helper import SignHelper
+from backend.config.settings import settings
+from backend.services import resilience
+from backend.services import single_flight
+from backend.services.cobo_service import (
+    COBO_UPSTREAM,
+    MAX_PAGE_SIZE,
+    to_api_chain_id,
+    build_contract_call_source,
+    build_evm_destination,
+    build_contract_call_params,
+    build_fee_estimate_params,
+    fast_fee_from_estimate,
+    fallback_fee,
+)
+
+_ERROR_TYPES = {'4XX': "ErrorResponse", '5XX': "ErrorResponse"}
+
+
+class _AsyncRESTResponse:
+    """Adapts an aiohttp response to the RESTResponse interface the SDK deserializes."""
+
+    def __init__(self, status: int, reason: str, headers, data: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+
+    def read(self):
+        return self.data
+
+    def getheaders(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+class AsyncCoboClient:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(AsyncCoboClient, cls).__new__(cls)
+                    instance._initialize_client()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize_client(self):
+        """Prepare the SDK serializers; the HTTP session is opened lazily per event loop."""
+        self.api_client = None
+        self.wallets_api = None
+        self.transactions_api = None
+        self._session = None
+        self._session_loop = None
+        self._session_lock = threading.Lock()
+        try:
+            if not settings.cobo_api_private_key or not settings.cobo_api_url:
+                print("Warning: Cobo API credentials not found.")
+                return
+
+            configuration = cobo_waas2.Configuration(
+                host=settings.cobo_api_url,
+                signer=LocalEd25519Signer(settings.cobo_api_private_key)
+            )
+            self.api_client = cobo_waas2.ApiClient(configuration)
+            self.wallets_api = wallets_api.WalletsApi(self.api_client)
+            self.transactions_api = transactions_api.TransactionsApi(self.api_client)
+        except Exception as e:
+            print(f"Failed to initialize async Cobo client: {e}")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._session_lock:
+            if self._session is None or self._session.closed or self._session_loop is not loop:
+                connector = aiohttp.TCPConnector(
+                    limit=settings.cobo_http_max_connections,
+                    limit_per_host=settings.cobo_http_max_connections_per_host,
+                )
+                timeout = aiohttp.ClientTimeout(
+                    total=settings.cobo_http_timeout,
+                    connect=settings.cobo_http_connect_timeout,
+                )
+                self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+                self._session_loop = loop
+            return self._session
+
+    async def aclose(self):
+        """Close the pooled HTTP session (call on application shutdown)."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _call(self, serialized, response_types: dict, timeout: float = None):
+        """
+        Sign and send a request produced by an SDK `_<op>_serialize` helper.
+
+        Signing follows ApiClient.call_api byte for byte; the response goes
+        through ApiClient.response_deserialize, so signature verification and
+        ApiException mapping are identical to the sync client.
+        """
+        if not self.api_client:
+            raise Exception("Cobo API not initialized")
+
+        method, url, headers, body, _post_params = serialized
+        url_parts = urlparse(url)
+        query_params = {k: v for k, v in parse_qsl(url_parts.query) if v}
+        url_parts = url_parts._replace(query=urlencode(query_params))
+        payload = json.dumps(body).encode('utf-8') if body else b""
+
+        async def attempt():
+            request_headers = dict(headers or {})
+            request_headers.update(SignHelper.generate_headers(
+                signer=self.api_client.configuration.signer,
+                body=payload,
+                method=method,
+                params=query_params,
+                path=url_parts.path
+            ))
+            total = resilience.attempt_timeout(timeout or settings.cobo_http_timeout)
+
+            session = self._get_session()
+            async with session.request(
+                method,
+                urlunparse(url_parts),
+                headers=request_headers,
+                data=payload if body else None,
+                timeout=aiohttp.ClientTimeout(total=total, connect=settings.cobo_http_connect_timeout)
+            ) as resp:
+                data = await resp.read()
+                response = _AsyncRESTResponse(resp.status, resp.reason, resp.headers, data)
+            if response.status in resilience.RETRYABLE_STATUS:
+                raise resilience.RetryableStatus(response.status, response)
+            return response
+
+        try:
+            response = await resilience.acall(COBO_UPSTREAM, attempt, idempotent=method.upper() == "GET")
+        except resilience.RetryableStatus as e:
+            response = e.response
+
+        return self.api_client.response_deserialize(
+            response_data=response,
+            response_types_map={**response_types, **_ERROR_TYPES},
+        ).data
+
+    async def get_transaction(self, transaction_id: str, timeout: float = None):
+        """
+        Get transaction details. Returns None on failure, like CoboClient.
+        Concurrent lookups of one ID share a request.
+        """
+        try:
+            return await single_flight.group("cobo:transaction").ado(
+                transaction_id,
+                self._call,
+                self.transactions_api._get_transaction_by_id_serialize(transaction_id=transaction_id),
+                {'200': "TransactionDetail"},
+                timeout=timeout
+            )
+        except resilience.UpstreamUnavailable:
+            raise
+        except Exception as e:
+            print(f"Failed to get transaction: {e}")
+            return None
+
+    async def list_addresses(self, wallet_id: str, chain_id: str = None, limit: int = MAX_PAGE_SIZE,
+                             after: str = None, timeout: float = None):
+        """
+        List addresses of a wallet.
+
+        Returns:
+            ListAddresses200Response: Page of addresses with pagination cursors.
+        """
+        return await self._call(
+            self.wallets_api._list_addresses_serialize(
+                wallet_id=wallet_id,
+                chain_ids=chain_id,
+                addresses=None,
+                limit=limit,
+                before=None,
+                after=after
+            ),
+            {'200': "ListAddresses200Response"},
+            timeout=timeout
+        )
+
+    async def get_wallet_address(self, wallet_id: str, chain_id: str = None):
+        """
+        Get the address of a wallet. Returns None if not found.
+        """
+        try:
+            response = await self.list_addresses(wallet_id, chain_id, limit=1)
+            if response.data:
+                return response.data[0].address
+            return None
+        except resilience.UpstreamUnavailable:
+            raise
+        except Exception as e:
+            print(f"Failed to get wallet address: {e}")
+            return None
+
+    async def estimate_fee(self, chain_id: str, source, destination, timeout: float = None):
+        """
+        Run Cobo's contract call fee estimation.
+
+        Returns:
+            EstimatedFee: The raw estimation response.
+        """
+        return await self._call(
+            self.transactions_api._estimate_fee_serialize(
+                estimate_fee_params=build_fee_estimate_params(chain_id, source, destination)
+            ),
+            {'201': "EstimatedFee"},
+            timeout=timeout
+        )
+
+    async def estimate_and_get_fee(self, chain_id: str, source, destination):
+        """
+        Estimates fee and returns the 'Fast' fee configuration, falling back to
+        the predefined fees when estimation fails.
+        """
+        api_chain_id = to_api_chain_id(chain_id)
+        try:
+            resp = await self.estimate_fee(chain_id, source, destination)
+            return fast_fee_from_estimate(resp, api_chain_id)
+        except Exception as e:
+            print(f"⚠️  Fee estimation failed: {e}")
+            return fallback_fee(api_chain_id)
+
+    async def _submit_contract_call(self, chain_id: str, wallet_id: str, to_address: str,
+                                    calldata: str, amount: int, description: str):
+        api_chain_id = to_api_chain_id(chain_id)
+        source = build_contract_call_source(wallet_id, await self.get_wallet_address(wallet_id, api_chain_id))
+        destination = build_evm_destination(to_address, calldata, amount)
+        fee = await self.estimate_and_get_fee(chain_id, source, destination)
+        params = build_contract_call_params(api_chain_id, source, destination, description=description, fee=fee)
+
+        response = await self._call(
+            self.transactions_api._create_contract_call_transaction_serialize(contract_call_params=params),
+            {'201': "CreateTransferTransaction201Response"}
+        )
+        return response.transaction_id
+
+    async def create_contract_call(self, chain_id: str, wallet_id: str, to_address: str, calldata: str, amount: int = 0):
+        """
+        Create a contract call transaction.
+        """
+        try:
+            return await self._submit_contract_call(
+                chain_id, wallet_id, to_address, calldata, amount,
+                description="Mint Token via TokenEngine"
+            )
+        except Exception as e:
+            print(f"Failed to create contract call: {e}")
+            raise e
+
+    async def deploy_contract(self, chain_id: str, wallet_id: str, bytecode: str, amount: int = 0):
+        """
+        Deploy a contract using Cobo WaaS.
+        """
+        try:
+            return await self._submit_contract_call(
+                chain_id, wallet_id, "", bytecode, amount,
+                description="Deploy Token via TokenEngine"
+            )
+        except Exception as e:
+            print(f"Failed to deploy contract: {e}")
+            raise e
+
+# Global instance
+async_cobo_client = AsyncCoboClient()
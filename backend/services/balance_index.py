@@ -0,0 +1,275 @@
+"""
+In-memory balance index maintained on ingest.
+
+Keeps every token's per-partition balances plus a secondary index from
+holder address to positions across all tokens, so "what does X hold" is a
+dictionary lookup instead of a scan of every mint and transfer. Alongside
+the balances it keeps cap-table rollups per token and partition (issued
+total, outstanding supply, holders ranked by balance), so token stats are
+read without touching the holder list.
+
+The index is built from the store on first use. After that it follows this
+process's store transactions (database.add_observer): the mints and
+transfers each commit added, replaced or removed are applied as postings,
+so ingest costs the size of the change, not of the store. A store written
+by another process (indexer, reconcile_data.py) is detected by its file
+version and triggers a rebuild.
+"""
+
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from backend import database
+from backend.services.ledger import ZERO_ADDRESS, base_units
+
+MAX_TOP_HOLDERS = 100
+
+
+def _store_version():
+    try:
+        stat = os.stat(database.DB_FILE)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def _mint_entry(m: dict):
+    """("mint", chain, contract, to, partition, value, tx, log_index), or None if invalid."""
+    if database.verification_state(m) == "invalid":
+        return None
+    return ("mint", m.get("chain_id"), str(m.get("contract_address", "")).lower(),
+            str(m["to_address"]).lower(), m["partition"], base_units(m),
+            m.get("tx_id"), m.get("log_index"))
+
+
+def _transfer_entry(t: dict):
+    """("transfer", chain, contract, from, to, partition, value, tx, log_index), or None if invalid."""
+    if database.verification_state(t) == "invalid":
+        return None
+    return ("transfer", t.get("chain_id"), str(t.get("contract_address", "")).lower(),
+            str(t["from_address"]).lower(), str(t["to_address"]).lower(), t["partition"],
+            base_units(t), t.get("tx_hash"), t.get("log_index"))
+
+
+ENTRY_FUNCTIONS = {"mints": _mint_entry, "transfers": _transfer_entry}
+
+
+def _entries(collections: dict) -> Counter:
+    """Valid ledger records of {collection: records} as a multiset of entries."""
+    entries = Counter()
+    for kind, entry_fn in ENTRY_FUNCTIONS.items():
+        entries.update(e for e in map(entry_fn, collections.get(kind, [])) if e is not None)
+    return entries
+
+
+def _postings(entry: tuple):
+    """(token, holder, partition, delta) of one entry."""
+    if entry[0] == "mint":
+        _, chain_id, contract, to, partition, value = entry[:6]
+        return [((chain_id, contract), to, partition, value)]
+    _, chain_id, contract, source, target, partition, value = entry[:7]
+    return [((chain_id, contract), source, partition, -value), ((chain_id, contract), target, partition, value)]
+
+
+class PartitionStats:
+    """Running cap-table figures of one token partition."""
+
+    __slots__ = ("issued", "supply", "ranked")
+
+    def __init__(self):
+        self.issued = 0   # sum of valid mints
+        self.supply = 0   # sum of positive holder balances
+        self.ranked = []  # (-balance, holder) of every positive holder, sorted
+
+    def update(self, holder: str, old: int, new: int):
+        """Move a holder from balance `old` to `new` (O(log n) search plus a list shift)."""
+        if old > 0:
+            del self.ranked[bisect_left(self.ranked, (-old, holder))]
+            self.supply -= old
+        if new > 0:
+            insort(self.ranked, (-new, holder))
+            self.supply += new
+
+
+class BalanceIndex:
+    def __init__(self):
+        self.balances = {}   # (chain_id, contract) -> {(holder, partition): base units}
+        self.stats = {}      # (chain_id, contract) -> {partition: PartitionStats}
+        self.holder_partitions = {}  # (chain_id, contract) -> {holder: number of positive partitions}
+        self.by_holder = {}  # holder -> {(chain_id, contract, partition): base units}
+        self.display = {}    # lowercase address -> address as first recorded
+        self.tokens = {}     # (chain_id, contract) -> {'contract_address', 'name', 'symbol'}
+        self._built = False
+        self._seq = None  # contract change sequence self.tokens was read at
+        self._version = None
+        self._lock = threading.RLock()
+
+    # --- Maintenance ---
+
+    def _post(self, token: tuple, holder: str, partition: str, delta: int):
+        token_balances = self.balances.setdefault(token, {})
+        old = token_balances.get((holder, partition), 0)
+        balance = old + delta
+        positions = self.by_holder.setdefault(holder, {})
+        if balance:
+            token_balances[(holder, partition)] = balance
+            positions[token + (partition,)] = balance
+        else:
+            token_balances.pop((holder, partition), None)
+            positions.pop(token + (partition,), None)
+
+        if holder == ZERO_ADDRESS or old == balance:
+            return
+        self._partition_stats(token, partition).update(holder, old, balance)
+        if (old > 0) != (balance > 0):
+            holders = self.holder_partitions.setdefault(token, {})
+            count = holders.get(holder, 0) + (1 if balance > 0 else -1)
+            if count:
+                holders[holder] = count
+            else:
+                holders.pop(holder, None)
+
+    def _partition_stats(self, token: tuple, partition: str) -> PartitionStats:
+        partitions = self.stats.setdefault(token, {})
+        stats = partitions.get(partition)
+        if stats is None:
+            stats = partitions[partition] = PartitionStats()
+        return stats
+
+    def _apply(self, entries: Counter, sign: int):
+        for entry, count in entries.items():
+            for token, holder, partition, delta in _postings(entry):
+                self._post(token, holder, partition, sign * count * delta)
+            if entry[0] == "mint":
+                self._partition_stats((entry[1], entry[2]), entry[4]).issued += sign * count * entry[5]
+
+    def _remember(self, records):
+        """Address display forms, for query results."""
+        for record in records:
+            address = record.get("to_address")
+            if address:
+                self.display.setdefault(str(address).lower(), address)
+
+    def _remember_tokens(self, data: dict):
+        """Token names, re-read only when the contracts changed."""
+        self.tokens = {
+            (c.get("chain_id"), str(c.get("contract_address") or "").lower()): {"contract_address": c.get("contract_address"), "name": c.get("name"), "symbol": c.get("symbol")}
+            for c in data.get("contracts", [])
+        }
+        self._seq = database.change_seq(data)
+
+    def rebuild(self, data: dict = None):
+        """Rebuild from the store (the current file unless `data` is given)."""
+        with self._lock:
+            version = _store_version()
+            data = database.load_db() if data is None else data
+            self.balances = {}
+            self.by_holder = {}
+            self.stats = {}
+            self.holder_partitions = {}
+            self._apply(_entries(data), 1)
+            for kind in ENTRY_FUNCTIONS:
+                self._remember(data.get(kind, []))
+            self._remember_tokens(data)
+            self._built = True
+            self._version = version
+
+    def ensure_current(self):
+        """Build on first use; rebuild if another process changed the store."""
+        with self._lock:
+            if not self._built or _store_version() != self._version:
+                self.rebuild()
+
+    def _before(self, data: dict):
+        """database observer: whether the index is in step with the store being changed."""
+        with self._lock:
+            return self._built and _store_version() == self._version
+
+    def _commit(self, was_current: bool, data: dict, changes: dict):
+        """database observer: post the records the transaction changed."""
+        with self._lock:
+            if not self._built:
+                return
+            if not was_current:
+                self.rebuild(data)
+                return
+            removed = _entries({kind: old for kind, (old, _) in changes.items()})
+            added = _entries({kind: new for kind, (_, new) in changes.items()})
+            self._apply(removed - added, -1)
+            self._apply(added - removed, 1)
+            for _, new in changes.values():
+                self._remember(new)
+            if database.change_seq(data) != self._seq:
+                self._remember_tokens(data)
+            self._version = _store_version()
+
+    # --- Queries ---
+
+    def portfolio(self, address: str) -> list:
+        """
+        Every position of a holder with a positive balance.
+
+        Returns:
+            list: [{'chain_id', 'contract_address', 'name', 'symbol', 'partition',
+                    'value' (base units, int)}]
+        """
+        self.ensure_current()
+        holder = address.lower()
+        if holder == ZERO_ADDRESS:
+            return []
+        with self._lock:
+            positions = sorted(self.by_holder.get(holder, {}).items())
+            tokens = self.tokens
+        result = []
+        for (chain_id, contract, partition), value in positions:
+            if value <= 0:
+                continue
+            token = tokens.get((chain_id, contract), {})
+            result.append({
+                "chain_id": chain_id,
+                "contract_address": token.get("contract_address") or contract,
+                "name": token.get("name"),
+                "symbol": token.get("symbol"),
+                "partition": partition,
+                "value": value,
+            })
+        return result
+
+    def token_stats(self, chain_id: str, contract_address: str, top: int = 10) -> dict:
+        """
+        Cap-table figures of a token from the running rollups; the cost does
+        not depend on the number of holders.
+
+        Args:
+            chain_id: Chain of the token.
+            contract_address: Token contract address.
+            top: How many of the largest holders to list per partition (at most MAX_TOP_HOLDERS).
+
+        Returns:
+            dict: {'holder_count', 'partitions': [{'partition', 'issued', 'supply',
+                   'holder_count', 'largest_holder_share', 'top_holders': [(holder, value)]}]}
+                  with amounts in base units (int), or None for an unknown token.
+        """
+        self.ensure_current()
+        top = max(0, min(top, MAX_TOP_HOLDERS))
+        token = (chain_id, contract_address.lower())
+        with self._lock:
+            if token not in self.stats and token not in self.tokens:
+                return None
+            partitions = []
+            for partition, stats in sorted(self.stats.get(token, {}).items()):
+                largest = -stats.ranked[0][0] if stats.ranked else 0
+                partitions.append({
+                    "partition": partition,
+                    "issued": stats.issued,
+                    "supply": stats.supply,
+                    "holder_count": len(stats.ranked),
+                    "largest_holder_share": largest / stats.supply if stats.supply > 0 else 0.0,
+                    "top_holders": [(holder, -value) for value, holder in stats.ranked[:top]],
+                })
+            return {"holder_count": len(self.holder_partitions.get(token, {})), "partitions": partitions}
+
+
+index = BalanceIndex()
+database.add_observer(index._before, index._commit)
@@ -0,0 +1,102 @@
+"""
+Per-chain block timestamp cache.
+
+Resolves block numbers to timestamps through an in-memory LRU per chain that
+is persisted next to the store, so a restart does not refetch headers.
+Missing headers are fetched in JSON-RPC batches: resolving thousands of mints
+costs a handful of requests.
+
+Only finalized blocks are cached; a block above the finality depth can
+still be replaced by a reorg.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from backend import database
+from backend.config.settings import settings
+
+CACHE_FILE = os.path.join(os.path.dirname(database.DB_FILE), "block_timestamps.json")
+HEADER_BATCH_SIZE = 100  # Headers per JSON-RPC batch request
+
+_caches = None  # chain_id -> OrderedDict(block -> timestamp), oldest first
+_lock = threading.Lock()
+
+
+def _load():
+    global _caches
+    if _caches is not None:
+        return _caches
+    _caches = {}
+    try:
+        with open(CACHE_FILE, "r") as f:
+            for chain_id, entries in json.load(f).items():
+                _caches[chain_id] = OrderedDict((int(n), ts) for n, ts in entries.items())
+    except (OSError, ValueError):
+        pass
+    return _caches
+
+
+def _save():
+    """Atomically persist every chain's cache."""
+    try:
+        tmp_file = f"{CACHE_FILE}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({chain_id: {str(n): ts for n, ts in cache.items()} for chain_id, cache in _caches.items()}, f)
+        os.replace(tmp_file, CACHE_FILE)
+    except OSError:
+        # Read-only filesystem (Vercel): the in-memory cache still works
+        pass
+
+
+def fetch_timestamps(w3, numbers: list) -> dict:
+    """Fetch block timestamps in JSON-RPC batches of HEADER_BATCH_SIZE."""
+    timestamps = {}
+    for i in range(0, len(numbers), HEADER_BATCH_SIZE):
+        batch_numbers = numbers[i:i + HEADER_BATCH_SIZE]
+        with w3.batch_requests() as batch:
+            for number in batch_numbers:
+                batch.add(w3.eth.get_block(number))
+            blocks = batch.execute()
+        for number, block in zip(batch_numbers, blocks):
+            timestamps[number] = int(block["timestamp"])
+    return timestamps
+
+
+def get_timestamps(w3, chain_id: str, numbers, finalized_block: int = None) -> dict:
+    """
+    Timestamps of the given blocks, fetching only the ones not cached.
+
+    Args:
+        w3: Web3 instance of the chain.
+        chain_id: Chain the blocks belong to.
+        numbers: Block numbers to resolve.
+        finalized_block: Highest block that may be cached (default: all).
+
+    Returns:
+        dict: block number -> unix timestamp
+    """
+    numbers = sorted(set(numbers))
+    with _lock:
+        cache = _load().setdefault(chain_id, OrderedDict())
+        result = {}
+        for number in numbers:
+            if number in cache:
+                cache.move_to_end(number)
+                result[number] = cache[number]
+
+    missing = [n for n in numbers if n not in result]
+    if not missing:
+        return result
+
+    fetched = fetch_timestamps(w3, missing)
+    result.update(fetched)
+    cacheable = {n: ts for n, ts in fetched.items() if finalized_block is None or n <= finalized_block}
+    if cacheable:
+        with _lock:
+            cache.update(cacheable)
+            while len(cache) > settings.block_cache_size:
+                cache.popitem(last=False)
+            _save()
+    return result
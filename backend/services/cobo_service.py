@@ -1,6 +1,8 @@
 
 import cobo_waas2
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from cobo_waas2.api import wallets_api, transactions_api
 from cobo_waas2.models.wallet_type import WalletType
 from cobo_waas2.models.wallet_subtype import WalletSubtype
@@ -21,14 +23,54 @@ from cobo_waas2.models.transaction_request_fee import TransactionRequestFee
 from cobo_waas2.models.fee_type import FeeType
 from cobo_waas2.crypto.local_ed25519_signer import LocalEd25519Signer
 from backend.config.settings import settings
+from backend.services import resilience
+from backend.services import single_flight
+
+# Cobo list endpoints accept a page size in the range [1, 50]
+MAX_PAGE_SIZE = 50
+
+COBO_UPSTREAM = "cobo"
+
+
+class ResilientApiClient(cobo_waas2.ApiClient):
+    """
+    ApiClient whose transport goes through the resilience layer: transient
+    failures are retried with jittered backoff, a circuit breaker fails fast
+    while Cobo is degraded, and each attempt's timeout honours the request
+    deadline.
+    """
+
+    def call_api(self, method, url, header_params=None, body=None, post_params=None, _request_timeout=None):
+        def attempt():
+            response = super(ResilientApiClient, self).call_api(
+                method, url,
+                header_params=dict(header_params or {}),  # fresh auth headers per attempt
+                body=body,
+                post_params=post_params,
+                _request_timeout=resilience.attempt_timeout(_request_timeout or settings.cobo_http_timeout)
+            )
+            if response.status in resilience.RETRYABLE_STATUS:
+                raise resilience.RetryableStatus(response.status, response)
+            return response
+
+        try:
+            return resilience.call(COBO_UPSTREAM, attempt, idempotent=method.upper() == "GET")
+        except resilience.RetryableStatus as e:
+            # Out of attempts: hand the response back so the SDK raises its ApiException
+            return e.response
 
 class CoboClient:
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(CoboClient, cls).__new__(cls)
-            cls._instance._initialize_client()
+            with cls._lock:
+                # Re-check under the lock so concurrent first calls share one client
+                if cls._instance is None:
+                    instance = super(CoboClient, cls).__new__(cls)
+                    instance._initialize_client()
+                    cls._instance = instance
         return cls._instance
 
     def _initialize_client(self):
@@ -45,7 +87,9 @@ class CoboClient:
                 host=settings.cobo_api_url,
                 signer=signer
             )
-            self.api_client = cobo_waas2.ApiClient(configuration)
+            # Size the urllib3 pool for FastAPI's threadpool sharing this client
+            configuration.connection_pool_maxsize = settings.cobo_http_max_connections
+            self.api_client = ResilientApiClient(configuration)
             self.wallets_api = wallets_api.WalletsApi(self.api_client)
             self.transactions_api = transactions_api.TransactionsApi(self.api_client)
         except Exception as e:
@@ -80,6 +124,135 @@ class CoboClient:
             print(f"Exception when calling WalletsApi->list_wallets: {e}")
             raise e
 
+    def _paginate(self, list_fn, page_size: int = MAX_PAGE_SIZE, prefetch: bool = False, **kwargs):
+        """
+        Lazily yield items from a cursor-paginated Cobo list endpoint.
+
+        Follows the `after` cursor returned in each response's pagination block
+        until Cobo reports an empty cursor, so only one page (two with prefetch)
+        is held in memory at a time.
+
+        Args:
+            list_fn (callable): SDK list method (e.g. transactions_api.list_transactions).
+            page_size (int): Items requested per page, clamped to [1, 50].
+            prefetch (bool): Fetch the next page in the background while the
+                caller consumes the current one.
+            **kwargs: Filters forwarded to the SDK method.
+
+        Yields:
+            Items from the response `data` field, in API order.
+        """
+        kwargs['limit'] = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+
+        def fetch(after):
+            page_kwargs = dict(kwargs)
+            if after:
+                page_kwargs['after'] = after
+            return list_fn(**page_kwargs)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            response = fetch(None)
+            while True:
+                pagination = getattr(response, 'pagination', None)
+                next_cursor = pagination.after if pagination else None
+                if not response.data:
+                    next_cursor = None
+
+                pending = None
+                if next_cursor and executor:
+                    pending = executor.submit(fetch, next_cursor)
+
+                for item in response.data or []:
+                    yield item
+
+                if not next_cursor:
+                    return
+                response = pending.result() if pending else fetch(next_cursor)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_wallets(self, wallet_type: WalletType = None, wallet_subtype: WalletSubtype = None,
+                     page_size: int = MAX_PAGE_SIZE, prefetch: bool = False):
+        """
+        Iterate over every wallet, following Cobo's pagination cursors.
+
+        Args:
+            wallet_type (WalletType, optional): Filter by wallet type.
+            wallet_subtype (WalletSubtype, optional): Filter by wallet subtype.
+            page_size (int): Wallets requested per page (max 50).
+            prefetch (bool): Fetch the next page while the current one is consumed.
+
+        Yields:
+            WalletInfo objects.
+        """
+        try:
+            yield from self._paginate(
+                self.wallets_api.list_wallets,
+                page_size=page_size,
+                prefetch=prefetch,
+                wallet_type=wallet_type,
+                wallet_subtype=wallet_subtype
+            )
+        except cobo_waas2.ApiException as e:
+            print(f"Exception when calling WalletsApi->list_wallets: {e}")
+            raise e
+
+    def iter_transactions(self, wallet_id: str = None, page_size: int = MAX_PAGE_SIZE,
+                          prefetch: bool = False, **filters):
+        """
+        Iterate over every transaction, following Cobo's pagination cursors.
+
+        Args:
+            wallet_id (str, optional): Only return transactions of this wallet.
+            page_size (int): Transactions requested per page (max 50).
+            prefetch (bool): Fetch the next page while the current one is consumed.
+            **filters: Extra list_transactions filters (e.g. types, statuses,
+                chain_ids, transaction_ids as comma-separated strings).
+
+        Yields:
+            Transaction objects.
+        """
+        try:
+            yield from self._paginate(
+                self.transactions_api.list_transactions,
+                page_size=page_size,
+                prefetch=prefetch,
+                wallet_ids=wallet_id,
+                **filters
+            )
+        except cobo_waas2.ApiException as e:
+            print(f"Exception when calling TransactionsApi->list_transactions: {e}")
+            raise e
+
+    def iter_addresses(self, wallet_id: str, chain_id: str = None,
+                       page_size: int = MAX_PAGE_SIZE, prefetch: bool = False):
+        """
+        Iterate over every address of a wallet, following Cobo's pagination cursors.
+
+        Args:
+            wallet_id (str): The wallet ID.
+            chain_id (str, optional): Only return addresses on this chain.
+            page_size (int): Addresses requested per page (max 50).
+            prefetch (bool): Fetch the next page while the current one is consumed.
+
+        Yields:
+            AddressInfo objects.
+        """
+        try:
+            yield from self._paginate(
+                self.wallets_api.list_addresses,
+                page_size=page_size,
+                prefetch=prefetch,
+                wallet_id=wallet_id,
+                chain_ids=chain_id
+            )
+        except cobo_waas2.ApiException as e:
+            print(f"Exception when calling WalletsApi->list_addresses: {e}")
+            raise e
+
     def check_connection(self):
         """
         Verifies connection to Cobo WaaS 2.0 API.
@@ -106,10 +279,9 @@ class CoboClient:
             list: A list of dicts with wallet info [{'id': ..., 'address': ..., 'name': ...}]
         """
         try:
-            wallets = self.get_wallets(
+            wallets = self.iter_wallets(
                 wallet_type=WalletType.CUSTODIAL,
-                wallet_subtype=WalletSubtype.WEB3,
-                limit=50
+                wallet_subtype=WalletSubtype.WEB3
             )
             
             result = []
@@ -149,16 +321,48 @@ class CoboClient:
             print(f"Failed to list web3 wallets: {e}")
             return []
 
+    def get_transactions(self, transaction_ids: list) -> dict:
+        """
+        Look up many transactions with list requests of up to MAX_PAGE_SIZE IDs each.
+
+        Returns:
+            dict: transaction_id -> Transaction, for the IDs Cobo knows.
+        """
+        found = {}
+        for i in range(0, len(transaction_ids), MAX_PAGE_SIZE):
+            chunk = transaction_ids[i:i + MAX_PAGE_SIZE]
+            for tx in self.iter_transactions(transaction_ids=",".join(chunk)):
+                found[tx.transaction_id] = tx
+        return found
+
     def get_transaction(self, transaction_id: str):
         """
-        Get transaction details.
+        Get transaction details. Concurrent lookups of one ID share a request.
         """
         try:
-            return self.transactions_api.get_transaction_by_id(transaction_id)
+            return single_flight.group("cobo:transaction").do(
+                transaction_id, self.transactions_api.get_transaction_by_id, transaction_id
+            )
+        except resilience.UpstreamUnavailable:
+            raise
         except Exception as e:
             print(f"Failed to get transaction: {e}")
             return None
 
+    def find_transaction(self, transaction_id: str):
+        """
+        Look up one transaction, telling "Cobo does not know it" apart from a failed lookup.
+
+        Returns:
+            Transaction, or None if Cobo answers 404. Other errors are raised.
+        """
+        try:
+            return self.transactions_api.get_transaction_by_id(transaction_id)
+        except cobo_waas2.ApiException as e:
+            if e.status == 404:
+                return None
+            raise
+
     def list_transactions(self, wallet_id: str = None, limit: int = 10):
         """
         List transactions.
@@ -173,6 +377,15 @@ class CoboClient:
             print(f"Failed to list transactions: {e}")
             return []
 
+    def list_addresses(self, wallet_id: str, chain_id: str = None, limit: int = MAX_PAGE_SIZE):
+        """
+        List addresses of a wallet (first page only; see iter_addresses).
+        """
+        kwargs = {'wallet_id': wallet_id, 'limit': limit}
+        if chain_id:
+            kwargs['chain_ids'] = chain_id
+        return self.wallets_api.list_addresses(**kwargs).data
+
     def get_wallet_address(self, wallet_id: str, chain_id: str = None):
         """
         Get the address of a wallet.
@@ -200,6 +413,8 @@ class CoboClient:
             if response.data:
                 return response.data[0].address
             return None
+        except resilience.UpstreamUnavailable:
+            raise
         except Exception as e:
             print(f"Failed to get wallet address: {e}")
             return None
@@ -225,99 +440,29 @@ class CoboClient:
             print(f"✅ Found wallet: {w['name']} ({address}) Type: {w['type']} Subtype: {w['subtype']}")
             return {"wallet_id": wallet_id, "address": address, "subtype": w['subtype']}
 
+    def estimate_fee(self, chain_id: str, source, destination):
+        """
+        Run Cobo's contract call fee estimation.
+
+        Returns:
+            EstimatedFee: The raw estimation response.
+        """
+        return self.transactions_api.estimate_fee(build_fee_estimate_params(chain_id, source, destination))
+
     def estimate_and_get_fee(self, chain_id: str, source, destination):
         """
         Estimates fee and returns the 'Fast' fee configuration.
         Returns None if estimation fails.
         """
+        api_chain_id = to_api_chain_id(chain_id)
         try:
             print(f"Estimating fee for {chain_id}...")
-            # Map internal chain IDs if necessary
-            api_chain_id = chain_id
-            if chain_id == "MATIC_POLYGON":
-                api_chain_id = "MATIC" # User confirmed chain_id is MATIC
-            elif chain_id == "ETH_SEPOLIA":
-                api_chain_id = "SETH"  # Cobo uses SETH for Sepolia testnet
-            
-            params = EstimateContractCallFeeParams(
-                request_id=str(uuid.uuid4()),
-                request_type=EstimateFeeRequestType.CONTRACTCALL,
-                chain_id=api_chain_id,
-                source=source,
-                destination=destination
-            )
-            
-            req = EstimateFeeParams(actual_instance=params)
-            resp = self.transactions_api.estimate_fee(req)
-            
-            # Extract Fast fee
-            if hasattr(resp.actual_instance, 'fast'):
-                fast_fee = resp.actual_instance.fast
-                print(f"✅ Fee Estimated (Fast): gas_price={fast_fee.gas_price if hasattr(fast_fee, 'gas_price') else 'N/A'}, gas_limit={fast_fee.gas_limit}")
-                
-                 # For deployment, use higher gas limit
-                # Cobo's estimation may not account for large deployments
-                deployment_gas_limit = "5000000"  # 5M gas for deployment
-                
-                # Determine correct token_id
-                token_id = api_chain_id  # Use api_chain_id directly (MATIC for Polygon, BSC_BNB for BSC)
-                
-                # Construct TransactionRequestFee with estimated gas price but higher gas limit
-                # EIP-1559
-                if hasattr(fast_fee, 'max_fee_per_gas') and hasattr(fast_fee, 'max_priority_fee_per_gas'):
-                     return TransactionRequestFee(
-                        actual_instance=TransactionRequestEvmEip1559Fee(
-                            max_fee_per_gas=fast_fee.max_fee_per_gas,
-                            max_priority_fee_per_gas=fast_fee.max_priority_fee_per_gas,
-                            gas_limit=deployment_gas_limit,  # Override with higher limit
-                            fee_type=resp.actual_instance.fee_type,
-                            token_id=token_id
-                        )
-                    )
-                # Legacy
-                elif hasattr(fast_fee, 'gas_price'):
-                    return TransactionRequestFee(
-                        actual_instance=TransactionRequestEvmLegacyFee(
-                            gas_price=fast_fee.gas_price,
-                            gas_limit=deployment_gas_limit,  # Override with higher limit
-                            fee_type=resp.actual_instance.fee_type,
-                            token_id=token_id
-                        )
-                    )
-            
-            print("⚠️ Could not extract 'fast' fee from response.")
-            return None
-            
-            
+            resp = self.estimate_fee(chain_id, source, destination)
+            return fast_fee_from_estimate(resp, api_chain_id)
         except Exception as e:
             print(f"⚠️  Fee estimation failed: {e}")
-            print(f"Using fallback 'Fast' fee for {api_chain_id}")
-            
-            # Fallback to predefined "Fast" fees
-            if api_chain_id == "MATIC":
-                return TransactionRequestFee(
-                    actual_instance=TransactionRequestEvmLegacyFee(
-                        gas_price='150000000000',  # 150 Gwei (aggressive for Polygon)
-                        fee_type=FeeType.EVM_LEGACY,
-                        token_id='MATIC_MATIC',  # Polygon native gas token
-                        gas_limit='300000'
-                    )
-                )
-            elif api_chain_id == "BSC_BNB":
-                return TransactionRequestFee(
-                    actual_instance=TransactionRequestEvmLegacyFee(
-                        gas_price='5000000000',  # 5 Gwei (fast for BSC)
-                        fee_type=FeeType.EVM_LEGACY,
-                        token_id='BSC_BNB',  # BSC native gas token
-                        gas_limit='300000'
-                    )
-                )
-            
-            # Ultimate fallback
-            print("⚠️  No fallback fee available for this chain, using None")
-            return None
+            return fallback_fee(api_chain_id)
 
-            
     def create_contract_call(self, chain_id: str, wallet_id: str, to_address: str, calldata: str, amount: int = 0):
         """
         Create a contract call transaction.
@@ -326,38 +471,15 @@ class CoboClient:
             if not self.transactions_api:
                 raise Exception("Cobo API not initialized")
             
-            # Map internal chain IDs if necessary
-            api_chain_id = chain_id
-            if chain_id == "MATIC_POLYGON":
-                api_chain_id = "MATIC"
-            elif chain_id == "ETH_SEPOLIA":
-                api_chain_id = "SETH"  # Cobo uses SETH for Sepolia testnet
-
-            source = ContractCallSource(
-                actual_instance=CustodialWeb3ContractCallSource(
-                    source_type=ContractCallSourceType.WEB3,
-                    wallet_id=wallet_id,
-                    address=self.get_wallet_address(wallet_id, api_chain_id)
-                )
-            )
-            
-            destination = ContractCallDestination(
-                actual_instance=EvmContractCallDestination(
-                    destination_type=ContractCallDestinationType.EVM_CONTRACT,
-                    address=to_address,
-                    calldata=calldata,
-                    amount=str(amount)
-                )
-            )
+            api_chain_id = to_api_chain_id(chain_id)
+            source = build_contract_call_source(wallet_id, self.get_wallet_address(wallet_id, api_chain_id))
+            destination = build_evm_destination(to_address, calldata, amount)
         
             # Estimate Fee - needed for correct gas limits and pricing
             fee = self.estimate_and_get_fee(chain_id, source, destination)
             
-            params = ContractCallParams(
-                request_id=str(uuid.uuid4()), # Ensure unique ID for every request
-                chain_id=api_chain_id,
-                source=source,
-                destination=destination,
+            params = build_contract_call_params(
+                api_chain_id, source, destination,
                 description="Mint Token via TokenEngine",
                 fee=fee  # Use estimated fee
             )
@@ -377,41 +499,17 @@ class CoboClient:
             if not self.transactions_api:
                 raise Exception("Cobo API not initialized")
             
-            # Map internal chain IDs if necessary
-            api_chain_id = chain_id
-            if chain_id == "MATIC_POLYGON":
-                api_chain_id = "MATIC"
-            elif chain_id == "ETH_SEPOLIA":
-                api_chain_id = "SETH"  # Cobo uses SETH for Sepolia testnet
-
-            source = ContractCallSource(
-                actual_instance=CustodialWeb3ContractCallSource(
-                    source_type=ContractCallSourceType.WEB3,
-                    wallet_id=wallet_id,
-                    address=self.get_wallet_address(wallet_id, api_chain_id)
-                )
-            )
-            
-            # For deployment, destination address is usually empty or null.
-            # We use EvmContractCallDestination with empty address.
-            destination = ContractCallDestination(
-                actual_instance=EvmContractCallDestination(
-                    destination_type=ContractCallDestinationType.EVM_CONTRACT,
-                    address="", # Empty address for deployment
-                    calldata=bytecode,
-                    amount=str(amount)
-                )
-            )
+            api_chain_id = to_api_chain_id(chain_id)
+            source = build_contract_call_source(wallet_id, self.get_wallet_address(wallet_id, api_chain_id))
+            # For deployment, destination address is empty.
+            destination = build_evm_destination("", bytecode, amount)
         
             # Estimate Fee for deployment - needed to get correct gas limit
             # Deployments need much higher gas limits than simple transfers
             fee = self.estimate_and_get_fee(chain_id, source, destination)
             
-            params = ContractCallParams(
-                request_id=str(uuid.uuid4()),
-                chain_id=api_chain_id,
-                source=source,
-                destination=destination,
+            params = build_contract_call_params(
+                api_chain_id, source, destination,
                 description="Deploy Token via TokenEngine",
                 fee=fee  # Use estimated fee for deployment
             )
@@ -423,5 +521,122 @@ class CoboClient:
             print(f"Failed to deploy contract: {e}")
             raise e
 
+
+# --- Request builders shared by the sync and async clients ---
+
+def to_api_chain_id(chain_id: str) -> str:
+    """Map internal chain IDs to the chain IDs Cobo expects."""
+    if chain_id == "MATIC_POLYGON":
+        return "MATIC"  # User confirmed chain_id is MATIC
+    if chain_id == "ETH_SEPOLIA":
+        return "SETH"  # Cobo uses SETH for Sepolia testnet
+    return chain_id
+
+def build_contract_call_source(wallet_id: str, address: str) -> ContractCallSource:
+    return ContractCallSource(
+        actual_instance=CustodialWeb3ContractCallSource(
+            source_type=ContractCallSourceType.WEB3,
+            wallet_id=wallet_id,
+            address=address
+        )
+    )
+
+def build_evm_destination(to_address: str, calldata: str, amount: int = 0) -> ContractCallDestination:
+    return ContractCallDestination(
+        actual_instance=EvmContractCallDestination(
+            destination_type=ContractCallDestinationType.EVM_CONTRACT,
+            address=to_address,
+            calldata=calldata,
+            amount=str(amount)
+        )
+    )
+
+def build_contract_call_params(api_chain_id: str, source, destination, description: str, fee=None) -> ContractCallParams:
+    return ContractCallParams(
+        request_id=str(uuid.uuid4()),  # Ensure unique ID for every request
+        chain_id=api_chain_id,
+        source=source,
+        destination=destination,
+        description=description,
+        fee=fee
+    )
+
+def build_fee_estimate_params(chain_id: str, source, destination) -> EstimateFeeParams:
+    params = EstimateContractCallFeeParams(
+        request_id=str(uuid.uuid4()),
+        request_type=EstimateFeeRequestType.CONTRACTCALL,
+        chain_id=to_api_chain_id(chain_id),
+        source=source,
+        destination=destination
+    )
+    return EstimateFeeParams(actual_instance=params)
+
+def fast_fee_from_estimate(resp, api_chain_id: str):
+    """
+    Turn an EstimatedFee response into the 'Fast' TransactionRequestFee.
+    Returns None if no 'fast' fee is present.
+    """
+    if hasattr(resp.actual_instance, 'fast'):
+        fast_fee = resp.actual_instance.fast
+        print(f"✅ Fee Estimated (Fast): gas_price={fast_fee.gas_price if hasattr(fast_fee, 'gas_price') else 'N/A'}, gas_limit={fast_fee.gas_limit}")
+        
+        # For deployment, use higher gas limit
+        # Cobo's estimation may not account for large deployments
+        deployment_gas_limit = "5000000"  # 5M gas for deployment
+        
+        # Use api_chain_id directly (MATIC for Polygon, BSC_BNB for BSC)
+        token_id = api_chain_id
+        
+        # EIP-1559
+        if hasattr(fast_fee, 'max_fee_per_gas') and hasattr(fast_fee, 'max_priority_fee_per_gas'):
+            return TransactionRequestFee(
+                actual_instance=TransactionRequestEvmEip1559Fee(
+                    max_fee_per_gas=fast_fee.max_fee_per_gas,
+                    max_priority_fee_per_gas=fast_fee.max_priority_fee_per_gas,
+                    gas_limit=deployment_gas_limit,  # Override with higher limit
+                    fee_type=resp.actual_instance.fee_type,
+                    token_id=token_id
+                )
+            )
+        # Legacy
+        elif hasattr(fast_fee, 'gas_price'):
+            return TransactionRequestFee(
+                actual_instance=TransactionRequestEvmLegacyFee(
+                    gas_price=fast_fee.gas_price,
+                    gas_limit=deployment_gas_limit,  # Override with higher limit
+                    fee_type=resp.actual_instance.fee_type,
+                    token_id=token_id
+                )
+            )
+    
+    print("⚠️ Could not extract 'fast' fee from response.")
+    return None
+
+def fallback_fee(api_chain_id: str):
+    """Predefined 'Fast' fees used when estimation fails."""
+    print(f"Using fallback 'Fast' fee for {api_chain_id}")
+    if api_chain_id == "MATIC":
+        return TransactionRequestFee(
+            actual_instance=TransactionRequestEvmLegacyFee(
+                gas_price='150000000000',  # 150 Gwei (aggressive for Polygon)
+                fee_type=FeeType.EVM_LEGACY,
+                token_id='MATIC_MATIC',  # Polygon native gas token
+                gas_limit='300000'
+            )
+        )
+    elif api_chain_id == "BSC_BNB":
+        return TransactionRequestFee(
+            actual_instance=TransactionRequestEvmLegacyFee(
+                gas_price='5000000000',  # 5 Gwei (fast for BSC)
+                fee_type=FeeType.EVM_LEGACY,
+                token_id='BSC_BNB',  # BSC native gas token
+                gas_limit='300000'
+            )
+        )
+    
+    # Ultimate fallback
+    print("⚠️  No fallback fee available for this chain, using None")
+    return None
+
 # Global instance
 cobo_client = CoboClient()
@@ -0,0 +1,77 @@
+"""
+Confirmation tracking for submitted transactions.
+
+Records the block number / hash a transaction was mined in and how many
+confirmations it has. Once a chain's finality depth is reached the record is
+marked finalized and never needs to be re-verified; until then every refresh
+re-reads the receipt, so a reorg that moves or drops the transaction is
+picked up.
+"""
+
+from web3.exceptions import TransactionNotFound
+from backend.services.rpc_service import get_web3
+
+# Blocks after which a reorg is considered practically impossible
+CHAIN_FINALITY_DEPTHS = {
+    "BSC_BNB": 15,
+    "MATIC_POLYGON": 128,
+    "MATIC": 128,
+    "ETH_SEPOLIA": 64,
+    "SETH": 64,
+    "ETH": 64,
+}
+DEFAULT_FINALITY_DEPTH = 64
+
+
+def finality_depth(chain_id: str) -> int:
+    return CHAIN_FINALITY_DEPTHS.get(chain_id, DEFAULT_FINALITY_DEPTH)
+
+
+def refresh_confirmations(record: dict, chain_id: str, tx_hash: str, head: int = None) -> bool:
+    """
+    Update `block_number`, `block_hash`, `confirmations` and `finalized` on a record.
+
+    Args:
+        record: Contract or mint record to update in place.
+        chain_id: Chain the transaction was sent to.
+        tx_hash: On-chain transaction hash.
+        head: Current block number, if the caller already fetched it.
+
+    Returns:
+        bool: True if the record changed.
+
+    Raises:
+        Any error of the receipt lookup other than "not found" (timeouts,
+        UpstreamUnavailable, ...): the record is left as it was.
+    """
+    if record.get("finalized") or not tx_hash or not str(tx_hash).startswith("0x"):
+        return False
+
+    w3 = get_web3(chain_id)
+    before = (record.get("block_number"), record.get("block_hash"), record.get("confirmations"), record.get("finalized"))
+    try:
+        receipt = w3.eth.get_transaction_receipt(tx_hash)
+    except TransactionNotFound:
+        receipt = None
+
+    if receipt is None:
+        # Not mined (any more): a reorg may have dropped it back to the mempool
+        if record.get("block_hash"):
+            print(f"⚠️ {tx_hash} is no longer in block {record.get('block_number')}; possible reorg")
+        record["block_number"] = None
+        record["block_hash"] = None
+        record["confirmations"] = 0
+        record["finalized"] = False
+    else:
+        head = w3.eth.block_number if head is None else head
+        block_hash = receipt["blockHash"]
+        block_hash = block_hash.to_0x_hex() if hasattr(block_hash, "to_0x_hex") else str(block_hash)
+        if record.get("block_hash") and record["block_hash"] != block_hash:
+            print(f"⚠️ {tx_hash} moved from block {record.get('block_number')} to {receipt['blockNumber']} (reorg)")
+        record["block_number"] = receipt["blockNumber"]
+        record["block_hash"] = block_hash
+        record["confirmations"] = max(0, head - receipt["blockNumber"] + 1)
+        record["finalized"] = record["confirmations"] >= finality_depth(chain_id)
+
+    after = (record.get("block_number"), record.get("block_hash"), record.get("confirmations"), record.get("finalized"))
+    return before != after
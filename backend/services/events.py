@@ -0,0 +1,134 @@
+"""
+In-memory fan-out of the store's status events to Server-Sent Events clients.
+
+The store appends an event whenever a contract or mint changes status (see
+database.transaction()). The hub keeps the recent ones in memory and wakes
+waiting SSE connections as soon as this process commits new events; writes
+by other processes (indexer, reconcile_data.py) are picked up by a cheap
+stat of the store file while connections idle. Clients never trigger
+upstream calls or store reads of their own.
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from backend import database
+
+HEARTBEAT_SECONDS = 15.0
+
+
+def _store_version():
+    try:
+        stat = os.stat(database.DB_FILE)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+class EventHub:
+    def __init__(self):
+        self._events = deque(maxlen=database.EVENT_LOG_SIZE)
+        self._loaded = False
+        self._version = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._changed = None  # asyncio.Event, replaced after every wake-up
+
+    def _load(self):
+        """(Re)load the persisted event log; caller holds the lock."""
+        version = _store_version()
+        events = database.load_db().get("events", [])
+        self._events.clear()
+        self._events.extend(events)
+        self._version = version
+        self._loaded = True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+
+    def refresh(self) -> bool:
+        """Reload if another process wrote the store. Returns True if events were added."""
+        self._ensure_loaded()
+        if _store_version() == self._version:
+            return False
+        with self._lock:
+            if _store_version() == self._version:
+                return False
+            last = self.last_id()
+            self._load()
+            added = self.last_id() > last
+        if added and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake)
+        return added
+
+    def publish(self, events: list):
+        """database listener: called from whichever thread committed the transaction."""
+        with self._lock:
+            if self._loaded:
+                # A concurrent reload may already have read these from the store
+                last = self.last_id()
+                self._events.extend(e for e in events if e["id"] > last)
+                self._version = _store_version()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    def last_id(self) -> int:
+        return self._events[-1]["id"] if self._events else 0
+
+    def since(self, last_id: int) -> tuple:
+        """
+        Events after `last_id`.
+
+        Returns:
+            tuple: (events, complete) - complete is False if events after
+                   last_id were already dropped from the log.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            events = list(self._events)
+        if not events or events[-1]["id"] <= last_id:
+            return [], True
+        complete = last_id >= events[0]["id"] - 1
+        return [e for e in events if e["id"] > last_id], complete
+
+    def changed(self) -> asyncio.Event:
+        """
+        The event set on the next publish. Take it before reading since(), so
+        a publish in between is not missed.
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._changed = asyncio.Event()
+        return self._changed
+
+    async def wait(self, changed: asyncio.Event, timeout: float = HEARTBEAT_SECONDS) -> bool:
+        """Wait until `changed` is set, up to `timeout`. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+def matches(event: dict, chain_id: str = None, contract: str = None, owner: str = None) -> bool:
+    """Whether an event passes a client's filters (addresses compared case-insensitively)."""
+    if chain_id and event.get("chain_id") != chain_id:
+        return False
+    if contract and str(event.get("contract_address") or "").lower() != contract.lower():
+        return False
+    if owner and str(event.get("owner") or "").lower() != owner.lower():
+        return False
+    return True
+
+
+hub = EventHub()
+database.add_listener(hub.publish)
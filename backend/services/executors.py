@@ -0,0 +1,76 @@
+"""
+Bounded executors for blocking work called from `async def` endpoints.
+
+Each upstream gets its own thread pool sized by settings: Cobo SDK calls,
+chain RPC calls and store (file) access. A slow upstream can only exhaust
+its own slots instead of the shared AnyIO threadpool every sync endpoint
+draws from, and the event loop itself never blocks.
+
+The caller's contextvars (notably the request deadline) are carried into the
+worker thread.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from backend.config.settings import settings
+
+COBO = "cobo"
+RPC = "rpc"
+STORE = "store"
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def _limit(upstream: str) -> int:
+    return {
+        COBO: settings.cobo_max_concurrency,
+        RPC: settings.rpc_max_concurrency,
+        STORE: settings.store_max_concurrency,
+    }[upstream]
+
+
+def get_executor(upstream: str) -> ThreadPoolExecutor:
+    """The shared pool for an upstream, created on first use."""
+    executor = _executors.get(upstream)
+    if executor is not None:
+        return executor
+    with _lock:
+        executor = _executors.get(upstream)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=_limit(upstream), thread_name_prefix=f"{upstream}-io")
+            _executors[upstream] = executor
+    return executor
+
+
+async def run_blocking(upstream: str, fn, *args, **kwargs):
+    """
+    Run a blocking call on the upstream's pool and await its result.
+
+    Args:
+        upstream: COBO, RPC or STORE.
+        fn: Blocking callable.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(upstream), call)
+
+
+def executor_stats() -> dict:
+    """Pool size and queued calls per upstream."""
+    return {
+        name: {"max_workers": executor._max_workers, "queued": executor._work_queue.qsize()}
+        for name, executor in _executors.items()
+    }
+
+
+def shutdown():
+    """Stop every pool (call on application shutdown)."""
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
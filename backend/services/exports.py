@@ -0,0 +1,133 @@
+"""
+Streaming CSV / NDJSON exports of a token's cap table and mint history.
+
+Rows are encoded in chunks of CHUNK_ROWS as the client reads them, so the
+encoded output is never held whole; with gzip the chunks go through one
+streaming compressor rather than compressing a finished body. The rows
+themselves are not free:
+
+- holders: the token's ranked lists are copied from the balance index up
+  front (references to shared tuples, O(holders of the token)), so ingest
+  is not blocked for the length of a download.
+- mints: the store is a single JSON file, so the export parses all of it
+  (O(store), like every other reader of database.load_db), keeps the
+  token's mints (O(mints of the token)) and drops the rest before the
+  first row is sent.
+"""
+
+import csv
+import io
+import zlib
+from backend import database
+from backend.services import ledger
+from backend.services.balance_index import index as balance_index
+from backend.services.serialization import dumps
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+DATASETS = ("holders", "mints")
+CHUNK_ROWS = 1000
+
+COLUMNS = {
+    "holders": ["address", "partition", "balance", "value"],
+    "mints": ["tx_id", "log_index", "block_number", "timestamp", "partition", "to_address",
+              "amount", "value", "verification"],
+}
+
+
+def holder_rows(chain_id: str, contract_address: str):
+    """Holders with a positive balance, largest first per partition."""
+    token = (chain_id, contract_address.lower())
+    balance_index.ensure_current()
+    with balance_index._lock:
+        # Shallow copies (the tuples are shared), so ingest goes on while we stream
+        partitions = [(p, list(stats.ranked)) for p, stats in sorted(balance_index.stats.get(token, {}).items())]
+    for partition, ranked in partitions:
+        for value, holder in ranked:
+            value = -value
+            yield {
+                "address": balance_index.display.get(holder, holder),
+                "partition": partition,
+                "balance": ledger.to_token_units(value),
+                "value": str(value),
+            }
+
+
+def mint_rows(chain_id: str, contract_address: str):
+    """Mints of a token in store order, invalid ones included with their state."""
+    address = contract_address.lower()
+    mints = [
+        m for m in database.load_db().get("mints", [])
+        if m.get("chain_id") == chain_id and str(m.get("contract_address", "")).lower() == address
+    ]
+    for m in mints:
+        yield {
+            "tx_id": m.get("tx_id"),
+            "log_index": m.get("log_index"),
+            "block_number": m.get("block_number"),
+            "timestamp": m.get("block_timestamp") or m.get("timestamp"),
+            "partition": m.get("partition"),
+            "to_address": m.get("to_address"),
+            "amount": m.get("amount"),
+            "value": str(ledger.base_units(m)),
+            "verification": database.verification_state(m),
+        }
+
+
+def _csv_chunks(rows, columns: list):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(rows):
+    lines = []
+    for row in rows:
+        lines.append(dumps(row))
+        if len(lines) == CHUNK_ROWS:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(chain_id: str, contract_address: str, dataset: str = "holders",
+                  fmt: str = "csv", compress: bool = False):
+    """
+    Encoded chunks of an export, produced lazily.
+
+    Args:
+        chain_id: Chain of the token.
+        contract_address: Token contract address.
+        dataset: 'holders' (cap table) or 'mints' (mint history).
+        fmt: 'csv' or 'ndjson'.
+        compress: gzip the stream.
+
+    Returns:
+        iterator: bytes chunks.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"dataset must be one of {', '.join(DATASETS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    rows = holder_rows(chain_id, contract_address) if dataset == "holders" else mint_rows(chain_id, contract_address)
+    chunks = _csv_chunks(rows, COLUMNS[dataset]) if fmt == "csv" else _ndjson_chunks(rows)
+    return _gzip(chunks) if compress else chunks
@@ -0,0 +1,583 @@
+"""
+Block-range event indexer for SimpleERC1400 tokens.
+
+Walks `eth_getLogs` over block ranges for every Deployed contract of a chain
+with a single address-list filter per range, so the cost of a range does not
+grow with the number of tokens. Logs are routed to their token by address,
+decoded by topic0-dispatched eth_abi decoders (see log_decoder), and upserted into the
+store together with the chain's checkpoint, one store transaction per chunk.
+A crash therefore never leaves events without their checkpoint (or the
+reverse), and re-running resumes from the last committed chunk.
+
+Chunks are scanned concurrently across every RPC endpoint configured for the
+chain and bisected when an endpoint rejects a range as too large; results are
+committed strictly in block order, so the checkpoint only ever covers a
+contiguous prefix of scanned blocks.
+
+Only events below the chain's finality depth reach the mint and transfer
+tables; newer ones wait in a per-chain unconfirmed tier that is rolled back
+when a reorg is detected.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from backend import database
+from backend.config.settings import settings
+from backend.services.rpc_service import get_web3_pool
+from backend.services.confirmations import finality_depth
+from backend.services import block_cache
+from backend.services import resilience
+from backend.services import issuance
+from backend.services.ledger import base_units
+from backend.services.log_decoder import TOPIC_EVENTS, decode_logs, hex_str as _hex
+
+TOKEN_DECIMALS = 18  # SimpleERC1400 amounts are recorded with 18 decimals everywhere
+MAX_FILTER_ADDRESSES = 500  # Stay under the address-list limits of public RPCs
+
+# Fragments of the JSON-RPC error messages public RPCs return when a getLogs
+# range or its result set is too large
+RANGE_ERROR_MARKERS = (
+    "returned more than",
+    "block range",
+    "range too large",
+    "range is too large",
+    "range is too wide",
+    "too many results",
+    "too many logs",
+    "too many blocks",
+    "response size",
+    "query timeout",
+)
+# JSON-RPC rate limits: -32005 is also Infura's code for oversized getLogs
+# results, so its message is checked against RANGE_ERROR_MARKERS first
+RATE_LIMIT_CODES = {-32005, -32090}
+RATE_LIMIT_MARKERS = ("rate limit", "too many requests", "request limit", "exceeded the quota", "throttl")
+
+
+def _rpc_error(exc: Exception) -> tuple:
+    """(code, lowercase message) of a JSON-RPC error response, or (None, None)."""
+    error = None
+    rpc_response = getattr(exc, "rpc_response", None)
+    if isinstance(rpc_response, dict):
+        error = rpc_response.get("error")
+    if error is None and exc.args and isinstance(exc.args[0], dict):
+        error = exc.args[0]  # older web3 versions raise ValueError(error)
+    if not isinstance(error, dict):
+        return None, None
+    return error.get("code"), str(error.get("message", "")).lower()
+
+
+def classify_log_error(exc: Exception) -> str:
+    """
+    Classify a getLogs failure by HTTP status and JSON-RPC error code first.
+
+    Returns:
+        str: 'range' (split the range), 'rate_limit' (back off / fail over)
+             or 'other'.
+    """
+    status = resilience.status_of(exc)
+    if status == 429:
+        return "rate_limit"
+    if status is not None:
+        return "other"
+    code, message = _rpc_error(exc)
+    if code is None:
+        # Not an RPC error response (connection failures, bugs): never a range problem
+        return "other"
+    if any(marker in message for marker in RANGE_ERROR_MARKERS):
+        return "range"
+    if code in RATE_LIMIT_CODES or any(marker in message for marker in RATE_LIMIT_MARKERS):
+        return "rate_limit"
+    return "other"
+
+
+def is_range_error(exc: Exception) -> bool:
+    """Whether a getLogs failure means the block range / result set was too large."""
+    return classify_log_error(exc) == "range"
+
+
+def deployed_contracts(db: dict, chain_id: str) -> list:
+    """Deployed contracts of a chain that have a resolved on-chain address."""
+    return [
+        c for c in db.get("contracts", [])
+        if c.get("chain_id") == chain_id
+        and c.get("status") == "Deployed"
+        and database.verification_state(c) != "invalid"
+        and str(c.get("contract_address", "")).startswith("0x")
+        and len(c["contract_address"]) == 42
+    ]
+
+
+def _initial_block(w3, contracts: list) -> int:
+    """First block worth scanning: the earliest known deployment, else a bounded lookback."""
+    blocks = []
+    for c in contracts:
+        tx_hash = c.get("tx_hash")
+        if not tx_hash or not str(tx_hash).startswith("0x"):
+            continue
+        try:
+            receipt = w3.eth.get_transaction_receipt(tx_hash)
+            blocks.append(receipt["blockNumber"])
+        except Exception as e:
+            print(f"⚠️ Could not resolve deployment block for {c.get('name')}: {e}")
+    if blocks:
+        return min(blocks)
+    return max(0, w3.eth.block_number - settings.indexer_default_lookback)
+
+
+def fetch_logs(w3, addresses: list, from_block: int, to_block: int) -> list:
+    """
+    Raw IssuedByPartition / TransferByPartition logs emitted by `addresses` in a block range.
+
+    All addresses go into one filter, so a range costs one eth_getLogs call
+    however many tokens the chain has (split only past MAX_FILTER_ADDRESSES).
+    """
+    topics = [list(TOPIC_EVENTS.keys())]
+    checksummed = [w3.to_checksum_address(a) for a in addresses]
+    logs = []
+    for i in range(0, len(checksummed), MAX_FILTER_ADDRESSES):
+        logs.extend(w3.eth.get_logs({
+            'address': checksummed[i:i + MAX_FILTER_ADDRESSES],
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': topics,
+        }))
+    return logs
+
+
+def route_logs(logs: list, addresses: list) -> dict:
+    """
+    Group logs by the token that emitted them.
+
+    Returns:
+        dict: lowercase contract address -> logs, for tracked addresses only.
+    """
+    routed = {a.lower(): [] for a in addresses}
+    for log in logs:
+        bucket = routed.get(_hex(log.get('address', '')))
+        if bucket is not None:
+            bucket.append(log)
+    return routed
+
+
+def _fetch_with_failover(pool: list, slot: int, addresses: list, from_block: int, to_block: int) -> list:
+    """
+    fetch_logs on endpoint `slot`, moving on to the other endpoints if it is
+    unavailable. When every endpoint is rate limiting, backs off and goes
+    round again (up to upstream_retry_attempts rounds). Range errors are
+    raised at once for the caller to split the range.
+    """
+    last_error = None
+    attempts = settings.upstream_retry_attempts
+    for attempt in range(attempts):
+        for i in range(len(pool)):
+            w3 = pool[(slot + i) % len(pool)]
+            try:
+                return fetch_logs(w3, addresses, from_block, to_block)
+            except Exception as e:
+                if is_range_error(e):
+                    raise
+                last_error = e
+        if attempt == attempts - 1 or classify_log_error(last_error) != "rate_limit":
+            break
+        delay = resilience.backoff_delay(attempt)
+        print(f"Rate limited on every endpoint for blocks {from_block}-{to_block}, retrying in {delay:.2f}s")
+        time.sleep(delay)
+    raise last_error
+
+
+def scan_range(pool: list, slot: int, addresses: list, from_block: int, to_block: int):
+    """
+    Fetch the logs of one chunk, bisecting it while the RPC rejects a range as too large.
+
+    Args:
+        pool: Web3 instances for the chain's endpoints.
+        slot: Index of the endpoint to try first.
+        addresses: Contract addresses to scan.
+        from_block: First block of the chunk.
+        to_block: Last block of the chunk.
+
+    Returns:
+        tuple: (logs, largest range size that did not need splitting)
+    """
+    pending = [(from_block, to_block)]
+    logs = []
+    accepted = to_block - from_block + 1
+    while pending:
+        lo, hi = pending.pop()
+        try:
+            logs.extend(_fetch_with_failover(pool, slot, addresses, lo, hi))
+        except Exception as e:
+            if is_range_error(e) and hi > lo:
+                mid = (lo + hi) // 2
+                pending.append((mid + 1, hi))
+                pending.append((lo, mid))
+                accepted = min(accepted, mid - lo + 1)
+                continue
+            raise
+    return logs, accepted
+
+
+def _mint_record(chain_id: str, event: dict) -> dict:
+    return {
+        "chain_id": chain_id,
+        "contract_address": event['contract_address'],
+        "partition": event['partition'],
+        "to_address": event['to'],
+        "amount": event['value'] / 10 ** TOKEN_DECIMALS,
+        "value": str(event['value']),
+        "tx_id": event['tx_hash'],
+        "log_index": event['log_index'],
+        "block_number": event['block_number'],
+        "block_hash": event['block_hash'],
+        "finalized": True,
+        "block_timestamp": event.get('block_timestamp'),
+        "operator": event['operator'],
+        "source": "indexer",
+        "timestamp": event.get('block_timestamp') or int(time.time()),
+    }
+
+
+def _transfer_record(chain_id: str, event: dict) -> dict:
+    return {
+        "chain_id": chain_id,
+        "contract_address": event['contract_address'],
+        "partition": event['partition'],
+        "from_address": event['from'],
+        "to_address": event['to'],
+        "amount": event['value'] / 10 ** TOKEN_DECIMALS,
+        "value": str(event['value']),
+        "tx_hash": event['tx_hash'],
+        "log_index": event['log_index'],
+        "block_number": event['block_number'],
+        "block_hash": event['block_hash'],
+        "block_timestamp": event.get('block_timestamp'),
+        "finalized": True,
+        "operator": event['operator'],
+    }
+
+
+def _event_key(tx_hash: str, log_index) -> tuple:
+    return (str(tx_hash).lower(), log_index)
+
+
+def _recorded_mint_key(mint: dict) -> tuple:
+    """What an indexed mint must share with the API-recorded mint (no log index yet) it confirms."""
+    return (
+        mint.get("chain_id"),
+        str(mint.get("contract_address", "")).lower(),
+        mint.get("partition"),
+        str(mint.get("to_address", "")).lower(),
+        base_units(mint),
+    )
+
+
+def upsert_events(db: dict, chain_id: str, events: list) -> dict:
+    """
+    Upsert decoded events into an open store transaction.
+
+    Indexed mints are keyed by (tx hash, log index). A mint recorded by the
+    API before it was mined (keyed by a Cobo transaction ID) is replaced by
+    the matching indexed record rather than counted twice.
+
+    Returns:
+        dict: {'mints': inserted, 'transfers': inserted}
+    """
+    db.setdefault("mints", [])
+    db.setdefault("transfers", [])
+    mint_keys = {_event_key(m["tx_id"], m["log_index"]) for m in db["mints"] if m.get("log_index") is not None}
+    # API-recorded mints awaiting their event, oldest first per key
+    recorded = {}
+    for i, m in enumerate(db["mints"]):
+        if m.get("log_index") is None:
+            recorded.setdefault(_recorded_mint_key(m), []).append(i)
+    transfer_keys = {_event_key(t["tx_hash"], t["log_index"]) for t in db["transfers"]}
+    inserted = {"mints": 0, "transfers": 0}
+
+    for event in events:
+        key = _event_key(event['tx_hash'], event['log_index'])
+        if event['event'] == 'IssuedByPartition':
+            if key in mint_keys:
+                continue
+            record = _mint_record(chain_id, event)
+            matches = recorded.get(_recorded_mint_key(record))
+            if matches:
+                i = matches.pop(0)
+                record["cobo_id"] = db["mints"][i].get("tx_id")
+                db["mints"][i] = record
+            else:
+                db["mints"].append(record)
+            mint_keys.add(key)
+            inserted["mints"] += 1
+        else:
+            if key in transfer_keys:
+                continue
+            db["transfers"].append(_transfer_record(chain_id, event))
+            transfer_keys.add(key)
+            inserted["transfers"] += 1
+    return inserted
+
+
+def _find_fork_point(w3, tier: dict, floor: int, chain_head: int):
+    """
+    Check the unconfirmed tier against the canonical chain.
+
+    The header after the tier head must have the recorded head hash as its
+    parent; on mismatch, recorded blocks are walked back until one is still
+    canonical.
+
+    Returns:
+        int or None: Last block still canonical, or None if there was no reorg.
+    """
+    head, head_hash = tier.get("head"), tier.get("head_hash")
+    if head is None or head_hash is None:
+        return None
+    if head + 1 <= chain_head:
+        next_header = w3.eth.get_block(head + 1)
+        if _hex(next_header["parentHash"]) == head_hash:
+            return None
+    elif _hex(w3.eth.get_block(head)["hash"]) == head_hash:
+        return None
+
+    for number in sorted((int(n) for n in tier.get("blocks", {})), reverse=True):
+        if number >= head or number <= floor:
+            continue
+        if _hex(w3.eth.get_block(number)["hash"]) == tier["blocks"][str(number)]:
+            return number
+    return floor
+
+
+def _rollback_tier(tier: dict, fork: int) -> int:
+    """Drop unconfirmed events and block hashes above `fork`. Returns dropped events."""
+    kept = [e for e in tier["events"] if e["block_number"] <= fork]
+    dropped = len(tier["events"]) - len(kept)
+    tier["events"] = kept
+    tier["blocks"] = {n: h for n, h in tier["blocks"].items() if int(n) <= fork}
+    tier["head"] = fork
+    tier["head_hash"] = tier["blocks"].get(str(fork))
+    return dropped
+
+
+def _promote(tx_db: dict, chain_id: str, tier: dict, safe_head: int) -> dict:
+    """Move unconfirmed events that reached finality depth into the main tables."""
+    final = [e for e in tier["events"] if e["block_number"] <= safe_head]
+    tier["events"] = [e for e in tier["events"] if e["block_number"] > safe_head]
+    tier["blocks"] = {n: h for n, h in tier["blocks"].items() if int(n) > safe_head}
+    return upsert_events(tx_db, chain_id, final)
+
+
+def sync_chain(chain_id: str, to_block: int = None, max_chunks: int = None) -> dict:
+    """
+    Index one chain from its checkpoint up to `to_block` (default: chain head).
+
+    Events deeper than the chain's finality depth go straight into the mint
+    and transfer tables; newer ones are held in an unconfirmed tier with their
+    block hashes. Each run first checks the tier against the canonical chain
+    (parent-hash check) and rolls it back to the fork point on mismatch, then
+    promotes tier events that have reached finality. The checkpoint only ever
+    covers finalized blocks.
+
+    The checkpoint also records, per contract, the block it has been scanned
+    from. A contract that appears after the checkpoint has passed its
+    deployment (registered late, or a Pending deployment that resolved) is
+    first backfilled on its own from its deployment block up to the shared
+    head, resuming where an interrupted run stopped, and only then joins the
+    common address list.
+
+    Up to `indexer_concurrency` chunks are scanned at once, spread
+    round-robin over the chain's RPC endpoints. A chunk the RPC rejects as too
+    large is bisected, and later chunks are capped at the size that worked;
+    chunks that succeed whole let the chunk size double again up to that cap.
+    Finished chunks are buffered and committed in block order.
+
+    Returns:
+        dict: Summary with the scanned range, number of upserted events and
+              throughput (blocks/sec, logs/sec).
+    """
+    issuance.register()
+    pool = get_web3_pool(chain_id)
+    w3 = pool[0]
+    db = database.load_db()
+    contracts = deployed_contracts(db, chain_id)
+    summary = {"chain_id": chain_id, "contracts": len(contracts), "mints": 0, "transfers": 0,
+               "chunks": 0, "rolled_back": 0, "unconfirmed": 0}
+    if not contracts:
+        return summary
+
+    chain_head = w3.eth.block_number
+    end = chain_head if to_block is None else min(to_block, chain_head)
+    safe_head = chain_head - finality_depth(chain_id)
+
+    checkpoint = db.get("checkpoints", {}).get(chain_id)
+    if checkpoint:
+        finalized_block = checkpoint["block"]
+        # Checkpoints from before per-contract coverage: count what is deployed now as covered
+        joined = dict(checkpoint.get("contracts") or
+                      {c["contract_address"].lower(): finalized_block + 1 for c in contracts})
+        backfill = dict(checkpoint.get("backfill", {}))
+    else:
+        finalized_block = _initial_block(w3, contracts) - 1
+        joined = {c["contract_address"].lower(): finalized_block + 1 for c in contracts}
+        backfill = {}
+    tier = db.get("unconfirmed", {}).get(chain_id) or {"head": finalized_block, "head_hash": None, "blocks": {}, "events": []}
+
+    fork = _find_fork_point(w3, tier, finalized_block, chain_head)
+    if fork is not None:
+        print(f"⚠️ Reorg detected on {chain_id}: rolling unconfirmed events back to block {fork}")
+
+    def commit(tx_db, events=(), scanned_to=None, head_hash=None):
+        """Persist one step: tier changes, finalized events and the checkpoint, atomically."""
+        tx_db.setdefault("unconfirmed", {})[chain_id] = tier
+        if fork is not None and tier["head"] > fork:
+            summary["rolled_back"] += _rollback_tier(tier, fork)
+        inserted = upsert_events(tx_db, chain_id, [e for e in events if e["block_number"] <= safe_head])
+        held = {_event_key(e["tx_hash"], e["log_index"]) for e in tier["events"]}
+        for e in events:
+            if e["block_number"] > safe_head and _event_key(e["tx_hash"], e["log_index"]) not in held:
+                tier["events"].append(e)
+                tier["blocks"][str(e["block_number"])] = e["block_hash"]
+        if scanned_to is not None:
+            tier["head"] = scanned_to
+            tier["head_hash"] = head_hash
+            if head_hash:
+                tier["blocks"][str(scanned_to)] = head_hash
+        promoted = _promote(tx_db, chain_id, tier, safe_head)
+        final_block = max(finalized_block, min(safe_head, tier["head"]))
+        tx_db.setdefault("checkpoints", {})[chain_id] = {
+            "block": final_block, "updated_at": int(time.time()), "contracts": joined, "backfill": backfill,
+        }
+        for kind in ("mints", "transfers"):
+            summary[kind] += inserted[kind] + promoted[kind]
+        return final_block
+
+    with database.transaction() as tx_db:
+        finalized_block = commit(tx_db)
+
+    chunk = settings.indexer_chunk_size
+    ceiling = settings.indexer_max_chunk_size
+    workers = max(1, settings.indexer_concurrency)
+    log_count = 0
+    by_contract = {}  # lowercase address -> decoded events
+    started = time.monotonic()
+
+    def prepare(logs: list, addresses: list) -> list:
+        """Decode a chunk's logs, in block order and with block timestamps."""
+        routed = [log for token_logs in route_logs(logs, addresses).values() for log in token_logs]
+        events = decode_logs(routed, workers=settings.indexer_decode_workers)
+        for e in events:
+            address = e['contract_address'].lower()
+            by_contract[address] = by_contract.get(address, 0) + 1
+        events.sort(key=lambda e: (e['block_number'], e['log_index']))
+        timestamps = block_cache.get_timestamps(
+            w3, chain_id, [e['block_number'] for e in events], finalized_block=safe_head
+        )
+        for e in events:
+            e['block_timestamp'] = timestamps[e['block_number']]
+        return events
+
+    # Contracts the common range has not covered from their deployment: backfill
+    # each up to the shared head, one chunk per transaction
+    for c in contracts:
+        address = c["contract_address"].lower()
+        if address in joined:
+            continue
+        if address not in backfill:
+            start = _initial_block(w3, [c])
+            backfill[address] = {"from": start, "next": start}
+            print(f"Backfilling {c.get('name')} ({address}) on {chain_id} from block {start}")
+        progress = backfill[address]
+        while progress["next"] <= tier["head"] and (max_chunks is None or summary["chunks"] < max_chunks):
+            chunk_start = progress["next"]
+            chunk_end = min(chunk_start + chunk - 1, tier["head"])
+            logs, accepted = scan_range(pool, summary["chunks"] % len(pool), [address], chunk_start, chunk_end)
+            if accepted < chunk_end - chunk_start + 1:
+                chunk = ceiling = max(1, min(ceiling, accepted))
+            events = prepare(logs, [address])
+            progress["next"] = chunk_end + 1
+            with database.transaction() as tx_db:
+                finalized_block = commit(tx_db, events)
+            log_count += len(logs)
+            summary["chunks"] += 1
+            summary["backfill_chunks"] = summary.get("backfill_chunks", 0) + 1
+        if progress["next"] > tier["head"]:
+            joined[address] = backfill.pop(address)["from"]
+            with database.transaction() as tx_db:
+                finalized_block = commit(tx_db)
+
+    addresses = [c["contract_address"] for c in contracts if c["contract_address"].lower() in joined]
+    next_block = commit_block = tier["head"] + 1
+    summary["from_block"] = next_block
+    in_flight = {}  # future -> (from_block, to_block)
+    finished = {}  # from_block -> (to_block, logs), waiting for the chunks before it
+    submitted = summary["chunks"]
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while (addresses and len(in_flight) < workers and next_block <= end
+                   and (max_chunks is None or submitted < max_chunks)):
+                chunk_end = min(next_block + chunk - 1, end)
+                future = executor.submit(scan_range, pool, submitted % len(pool), addresses, next_block, chunk_end)
+                in_flight[future] = (next_block, chunk_end)
+                next_block = chunk_end + 1
+                submitted += 1
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_start, chunk_end = in_flight.pop(future)
+                logs, accepted = future.result()
+                if accepted < chunk_end - chunk_start + 1:
+                    chunk = ceiling = max(1, min(ceiling, accepted))
+                    print(f"Range {chunk_start}-{chunk_end} too large, shrinking chunk to {chunk}")
+                else:
+                    chunk = min(chunk * 2, ceiling)
+                finished[chunk_start] = (chunk_end, logs)
+
+            # Commit the contiguous prefix; later chunks wait for the gap to fill
+            while commit_block in finished:
+                chunk_end, logs = finished.pop(commit_block)
+                events = prepare(logs, addresses)
+                # Hash of the last scanned block anchors the next run's reorg check
+                head_hash = _hex(w3.eth.get_block(chunk_end)["hash"]) if chunk_end > safe_head else None
+                with database.transaction() as tx_db:
+                    finalized_block = commit(tx_db, events, scanned_to=chunk_end, head_hash=head_hash)
+
+                log_count += len(logs)
+                summary["chunks"] += 1
+                summary["to_block"] = chunk_end
+                commit_block = chunk_end + 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.monotonic() - started
+    blocks = commit_block - summary["from_block"]
+    summary["endpoints"] = len(pool)
+    summary["by_contract"] = by_contract
+    summary["elapsed"] = round(elapsed, 3)
+    summary["blocks_per_sec"] = round(blocks / elapsed, 1) if elapsed else 0.0
+    summary["logs_per_sec"] = round(log_count / elapsed, 1) if elapsed else 0.0
+    if blocks:
+        print(
+            f"📊 {chain_id}: {blocks} blocks, {log_count} logs in {elapsed:.1f}s "
+            f"({summary['blocks_per_sec']} blocks/s, {summary['logs_per_sec']} logs/s) across {len(pool)} endpoints"
+        )
+
+    summary["finalized_block"] = finalized_block
+    summary["unconfirmed"] = len(tier["events"])
+    return summary
+
+
+def sync_all(max_chunks: int = None) -> list:
+    """Index every chain that has Deployed contracts."""
+    db = database.load_db()
+    chains = sorted({c.get("chain_id") for c in db.get("contracts", []) if c.get("status") == "Deployed"})
+    results = []
+    for chain_id in chains:
+        try:
+            results.append(sync_chain(chain_id, max_chunks=max_chunks))
+        except Exception as e:
+            print(f"❌ Indexing {chain_id} failed: {e}")
+            results.append({"chain_id": chain_id, "error": str(e)})
+    return results
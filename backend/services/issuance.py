@@ -0,0 +1,148 @@
+"""
+Time-bucketed issuance rollups per token partition.
+
+The store keeps the base units issued and the number of mints of every
+token partition per hour and per day (db["issuance"]), so reports read a
+few hundred buckets instead of every mint. A store observer
+(database.add_observer) keeps the table current in every process that
+calls register(): the mints each write added, replaced or removed are
+posted to their buckets before the write, and writes that leave the mints
+alone cost nothing. The API, the indexer and reconcile_data.py register,
+covering mints recorded, confirmed and invalidated.
+scripts/backfill_rollups.py rebuilds the table.
+
+A mint is placed at its block time, or its submission time until indexed;
+mints with neither are left out.
+
+    db["issuance"] = {"day": {"<chain>|<contract>|<partition>": {"<bucket start>": [issued, mints]}}, "hour": ...}
+"""
+
+from collections import Counter
+from backend import database
+from backend.services.ledger import base_units
+
+BUCKETS = {"hour": 3600, "day": 86400}
+# Weeks are summed from days and start on Monday (1970-01-05 was one)
+WEEK = 7 * 86400
+WEEK_ORIGIN = 4 * 86400
+HISTORY_BUCKETS = ("hour", "day", "week")
+
+_registered = False
+
+
+def _series(chain_id: str, contract_address: str, partition: str) -> str:
+    return f"{chain_id}|{str(contract_address or '').lower()}|{partition}"
+
+
+def _entry(m: dict):
+    """(chain, contract, partition, time, base units) of a valid, dated mint, else None."""
+    at = m.get("block_timestamp") or m.get("timestamp")
+    if at is None or database.verification_state(m) == "invalid":
+        return None
+    return (m.get("chain_id"), m.get("contract_address"), m.get("partition"), int(at), base_units(m))
+
+
+def entries(mints) -> Counter:
+    """Issuance entries of some mints, as a multiset."""
+    return Counter(e for e in map(_entry, mints) if e is not None)
+
+
+def _post(table: dict, mints: Counter, sign: int):
+    for (chain_id, contract, partition, at, value), count in mints.items():
+        series = _series(chain_id, contract, partition)
+        for bucket, size in BUCKETS.items():
+            rows = table.setdefault(bucket, {}).setdefault(series, {})
+            start = str(at - at % size)
+            issued, minted = rows.get(start, ("0", 0))
+            minted += sign * count
+            if minted > 0:
+                # Amounts as strings: base units overflow 64-bit JSON integers
+                rows[start] = [str(int(issued) + sign * count * value), minted]
+            else:
+                rows.pop(start, None)
+                if not rows:
+                    del table[bucket][series]
+
+
+def build(data: dict) -> dict:
+    """The issuance table of a store, from scratch."""
+    table = {bucket: {} for bucket in BUCKETS}
+    _post(table, entries(data.get("mints", [])), 1)
+    return table
+
+
+def update(data: dict, changes: dict):
+    """
+    Post the mints a transaction added, changed or removed (see
+    database.TrackedList); build the table on first use. Store observer,
+    run before the write.
+    """
+    if "issuance" not in data:
+        data["issuance"] = build(data)
+        return
+    removed, added = changes["mints"]
+    if not removed and not added:
+        return
+    removed, added = entries(removed), entries(added)
+    _post(data["issuance"], removed - added, -1)
+    _post(data["issuance"], added - removed, 1)
+
+
+def _rows(buckets: dict) -> list:
+    rows = []
+    cumulative = 0
+    for start in sorted(buckets):
+        issued, minted = buckets[start]
+        cumulative += issued
+        rows.append({"start": start, "issued": str(issued), "mints": minted, "cumulative": str(cumulative)})
+    return rows
+
+
+def history(chain_id: str, contract_address: str, bucket: str = "day", db: dict = None) -> dict:
+    """
+    Issuance of a token per time bucket, per partition and in total.
+
+    Args:
+        chain_id: Chain of the token.
+        contract_address: Token contract address.
+        bucket: 'hour', 'day' or 'week'.
+        db: Loaded store (default: the current one).
+
+    Returns:
+        dict: {'partitions': {partition: rows}, 'total': rows}, rows being
+              [{'start' (unix time), 'issued', 'mints', 'cumulative'}] sorted
+              by start, with amounts as base-unit strings.
+    """
+    if bucket not in HISTORY_BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(HISTORY_BUCKETS)}")
+    db = database.load_db() if db is None else db
+    # Stores written before the table existed: aggregate now, persisted on the next write
+    table = db.get("issuance") or build(db)
+
+    prefix = _series(chain_id, contract_address, "")
+    partitions = {}
+    total = {}
+    for series, rows in table.get("day" if bucket == "week" else bucket, {}).items():
+        if not series.startswith(prefix):
+            continue
+        buckets = partitions.setdefault(series[len(prefix):], {})
+        for start, (issued, minted) in rows.items():
+            start = int(start)
+            if bucket == "week":
+                start -= (start - WEEK_ORIGIN) % WEEK
+            for target in (buckets, total):
+                row = target.setdefault(start, [0, 0])
+                row[0] += int(issued)
+                row[1] += minted
+    return {
+        "partitions": {partition: _rows(buckets) for partition, buckets in sorted(partitions.items())},
+        "total": _rows(total),
+    }
+
+
+def register():
+    """Keep the table current on this process's store writes (once per process)."""
+    global _registered
+    if not _registered:
+        database.add_observer(save_fn=update)
+        _registered = True
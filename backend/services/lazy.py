@@ -0,0 +1,58 @@
+"""
+Deferred imports for cold starts.
+
+On a serverless cold start every module imported by backend.main is paid
+for before the first request is answered, including SDKs the request may
+never touch (the cobo_waas2 model tree alone takes seconds). LazyObject
+stands in for such a module attribute and imports it on first use.
+"""
+
+import importlib
+import threading
+
+
+class LazyObject:
+    """
+    Proxy for `module.name`, imported on first attribute access.
+
+        cobo_client = LazyObject("backend.services.cobo_service", "cobo_client")
+        cobo_client.get_transaction(tx_id)  # imports cobo_service here
+    """
+
+    def __init__(self, module: str, name: str):
+        self.__dict__["_module"] = module
+        self.__dict__["_name"] = name
+        self.__dict__["_target"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _resolve(self):
+        target = self.__dict__["_target"]
+        if target is None:
+            with self.__dict__["_lock"]:
+                target = self.__dict__["_target"]
+                if target is None:
+                    target = getattr(importlib.import_module(self._module), self._name)
+                    self.__dict__["_target"] = target
+        return target
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._resolve(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_target"] is not None else "not loaded"
+        return f"<LazyObject {self._module}.{self._name} ({state})>"
+
+
+def is_loaded(obj) -> bool:
+    """False for a LazyObject that has not been imported yet."""
+    return not isinstance(obj, LazyObject) or obj.__dict__["_target"] is not None
+
+
+def preload(*objs):
+    """Import the targets of the given LazyObjects now (e.g. at server startup)."""
+    for obj in objs:
+        if isinstance(obj, LazyObject):
+            obj._resolve()
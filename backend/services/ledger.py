@@ -0,0 +1,303 @@
+"""
+Per-partition token balances computed from the local store.
+
+Balances are the sum of every IssuedByPartition credit (mint records) and
+every indexed TransferByPartition debit / credit, kept as exact integers in
+the token's base units, so the cap table matches the chain without a
+`balanceOfByPartition` call per holder.
+
+For point-in-time queries the ledger also keeps each holder's balance
+history as checkpoint rows (one per block with a change), answered with a
+binary search per holder. A token's checkpoints are built on its first
+as-of query and then maintained on ingest: every store transaction of this
+process posts the mints and transfers it changed (database.add_observer).
+A store written by another process drops them for a rebuild.
+"""
+
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from backend import database
+
+TOKEN_DECIMALS = 18
+ZERO_ADDRESS = "0x" + "00" * 20
+
+
+def base_units(record: dict) -> int:
+    """
+    Exact amount of a mint / transfer record in base units.
+
+    Indexed records carry the on-chain integer as `value`; mints recorded by
+    the API only have a token-unit `amount`, converted through Decimal so
+    e.g. 0.1 becomes exactly 10**17.
+    """
+    if record.get("value") is not None:
+        return int(record["value"])
+    return int(Decimal(str(record.get("amount") or 0)) * 10 ** TOKEN_DECIMALS)
+
+
+def to_token_units(value: int) -> float:
+    """Base units -> token units, for display."""
+    return float(Decimal(value) / 10 ** TOKEN_DECIMALS)
+
+
+def _for_token(records: list, chain_id: str, contract_address: str) -> list:
+    """Records of one token, minus the ones reconciliation found invalid."""
+    address = contract_address.lower()
+    return [
+        r for r in records
+        if r.get("chain_id") == chain_id and str(r.get("contract_address", "")).lower() == address
+        and database.verification_state(r) != "invalid"
+    ]
+
+
+def compute_balances(db: dict, chain_id: str, contract_address: str) -> Dict[Tuple[str, str], int]:
+    """
+    Net every mint credit and transfer debit / credit of one token.
+
+    Args:
+        db: Loaded store.
+        chain_id: Chain of the token.
+        contract_address: Token contract address.
+
+    Returns:
+        dict: (lowercase holder, partition) -> balance in base units.
+    """
+    balances = {}
+    for mint in _for_token(db.get("mints", []), chain_id, contract_address):
+        key = (str(mint["to_address"]).lower(), mint["partition"])
+        balances[key] = balances.get(key, 0) + base_units(mint)
+
+    for transfer in _for_token(db.get("transfers", []), chain_id, contract_address):
+        value = base_units(transfer)
+        source = (str(transfer["from_address"]).lower(), transfer["partition"])
+        target = (str(transfer["to_address"]).lower(), transfer["partition"])
+        balances[source] = balances.get(source, 0) - value
+        balances[target] = balances.get(target, 0) + value
+    return balances
+
+
+def get_holders(chain_id: str, contract_address: str, db: dict = None) -> List[dict]:
+    """
+    Holders of a token with a positive balance, per partition.
+
+    Returns:
+        list: [{'address', 'partition', 'balance' (token units), 'value' (base units, str)}]
+    """
+    db = database.load_db() if db is None else db
+    display = _display(db, chain_id, contract_address)
+
+    holders = []
+    for (holder, partition), value in compute_balances(db, chain_id, contract_address).items():
+        if value <= 0 or holder == ZERO_ADDRESS:
+            continue
+        holders.append({
+            "address": display.get(holder, holder),
+            "partition": partition,
+            "balance": to_token_units(value),
+            "value": str(value),
+        })
+    return holders
+
+
+def _display(db: dict, chain_id: str, contract_address: str) -> Dict[str, str]:
+    """Lowercase address -> the address as first recorded, to report addresses that way."""
+    display = {}
+    for record in _for_token(db.get("mints", []), chain_id, contract_address) + \
+            _for_token(db.get("transfers", []), chain_id, contract_address):
+        display.setdefault(str(record["to_address"]).lower(), record["to_address"])
+    return display
+
+
+# (chain_id, lowercase contract) -> {'history': build_history(), 'display': _display()}
+# of the tokens queried so far, valid for the store version _histories_version
+_histories = {}
+_histories_version = None
+_history_lock = threading.RLock()
+
+
+def _store_version():
+    """Changes whenever the store file is rewritten."""
+    database.ensure_db_file()
+    try:
+        stat = os.stat(database.DB_FILE)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def build_history(db: dict, chain_id: str, contract_address: str) -> Dict[Tuple[str, str], tuple]:
+    """
+    Balance checkpoints of every holder of a token, one row per change.
+
+    Only records with a block number take part: an API-recorded mint that
+    has not been indexed yet cannot be placed in time.
+
+    Returns:
+        dict: (lowercase holder, partition) -> (blocks, balances), two
+              parallel lists sorted by block with the balance after that block.
+    """
+    changes = []
+    for kind in ("mints", "transfers"):
+        for record in _for_token(db.get(kind, []), chain_id, contract_address):
+            changes.extend(_checkpoint_changes(kind, record))
+    changes.sort(key=lambda c: c[1])
+
+    history = {}
+    for _, block, holder, partition, delta in changes:
+        blocks, balances = history.setdefault((holder, partition), ([], []))
+        balance = (balances[-1] if balances else 0) + delta
+        if blocks and blocks[-1] == block:
+            # Several changes in one block collapse into one checkpoint
+            balances[-1] = balance
+        else:
+            blocks.append(block)
+            balances.append(balance)
+    return history
+
+
+def _checkpoint_changes(kind: str, record: dict) -> list:
+    """
+    Balance changes of one valid, indexed mint / transfer.
+
+    Returns:
+        list: [(token, block, lowercase holder, partition, delta)]
+    """
+    if record.get("block_number") is None or database.verification_state(record) == "invalid":
+        return []
+    token = (record.get("chain_id"), str(record.get("contract_address", "")).lower())
+    block = record["block_number"]
+    value = base_units(record)
+    target = (token, block, str(record["to_address"]).lower(), record["partition"], value)
+    if kind == "mints":
+        return [target]
+    return [(token, block, str(record["from_address"]).lower(), record["partition"], -value), target]
+
+
+def _post_checkpoint(history: dict, holder: str, partition: str, block: int, delta: int):
+    """Apply one change at `block` to a holder's checkpoints (and every later one)."""
+    blocks, balances = history.setdefault((holder, partition), ([], []))
+    i = bisect_left(blocks, block)
+    if i == len(blocks) or blocks[i] != block:
+        blocks.insert(i, block)
+        balances.insert(i, balances[i - 1] if i else 0)
+    for j in range(i, len(balances)):
+        balances[j] += delta
+
+
+def _token_history(chain_id: str, contract_address: str) -> dict:
+    """A token's checkpoints and display addresses, built on first use; caller holds _history_lock."""
+    global _histories_version
+    version = _store_version()
+    if version != _histories_version:
+        # Written by another process since: rebuild tokens as they are queried
+        _histories.clear()
+        _histories_version = version
+    key = (chain_id, contract_address.lower())
+    cached = _histories.get(key)
+    if cached is None:
+        db = database.load_db()
+        cached = {
+            "history": build_history(db, chain_id, contract_address),
+            "display": _display(db, chain_id, contract_address),
+        }
+        _histories[key] = cached
+    return cached
+
+
+def get_history(chain_id: str, contract_address: str) -> Dict[Tuple[str, str], tuple]:
+    """build_history() for the current store, kept up to date on ingest."""
+    with _history_lock:
+        return _token_history(chain_id, contract_address)["history"]
+
+
+def _before_commit(data: dict) -> bool:
+    """database observer: whether the checkpoints are in step with the store being changed."""
+    with _history_lock:
+        return _histories_version is not None and _store_version() == _histories_version
+
+
+def _after_commit(was_current: bool, data: dict, changes: dict):
+    """database observer: post the changed mints and transfers to the tokens built so far."""
+    global _histories_version
+    with _history_lock:
+        if not was_current:
+            _histories.clear()
+            _histories_version = None
+            return
+        for kind, (removed, added) in changes.items():
+            for sign, records in ((-1, removed), (1, added)):
+                for record in records:
+                    for token, block, holder, partition, delta in _checkpoint_changes(kind, record):
+                        cached = _histories.get(token)
+                        if cached is not None:
+                            _post_checkpoint(cached["history"], holder, partition, block, sign * delta)
+            for record in added:
+                token = (record.get("chain_id"), str(record.get("contract_address", "")).lower())
+                if token in _histories and record.get("to_address"):
+                    _histories[token]["display"].setdefault(str(record["to_address"]).lower(), record["to_address"])
+        _histories_version = _store_version()
+
+
+def balance_at(checkpoints: tuple, block: int) -> int:
+    """Balance as of the end of `block`, by binary search over a holder's checkpoints."""
+    blocks, balances = checkpoints
+    i = bisect_right(blocks, block)
+    return balances[i - 1] if i else 0
+
+
+def get_holders_at(chain_id: str, contract_address: str, block: int) -> List[dict]:
+    """
+    Holders of a token as of the end of `block`.
+
+    Returns:
+        list: [{'address', 'partition', 'balance' (token units), 'value' (base units, str)}]
+    """
+    with _history_lock:
+        cached = _token_history(chain_id, contract_address)
+        balances = [(holder, partition, balance_at(checkpoints, block))
+                    for (holder, partition), checkpoints in cached["history"].items()]
+        display = cached["display"]
+
+    holders = []
+    for holder, partition, value in balances:
+        if value <= 0 or holder == ZERO_ADDRESS:
+            continue
+        holders.append({
+            "address": display.get(holder, holder),
+            "partition": partition,
+            "balance": to_token_units(value),
+            "value": str(value),
+        })
+    return holders
+
+
+def snapshot(chain_id: str, contract_address: str, block: int) -> dict:
+    """
+    Full cap table of a token at `block`, with per-holder totals across partitions.
+
+    Returns:
+        dict: {'block', 'holders': [{'address', 'value', 'partitions'}],
+               'holder_count', 'total_supply'} with amounts as base-unit strings.
+    """
+    per_holder = {}
+    for row in get_holders_at(chain_id, contract_address, block):
+        entry = per_holder.setdefault(row["address"], {"address": row["address"], "value": 0, "partitions": {}})
+        entry["value"] += int(row["value"])
+        entry["partitions"][row["partition"]] = row["value"]
+
+    holders = sorted(per_holder.values(), key=lambda h: (-h["value"], h["address"]))
+    total = sum(h["value"] for h in holders)
+    for h in holders:
+        h["value"] = str(h["value"])
+    return {
+        "block": block,
+        "holders": holders,
+        "holder_count": len(holders),
+        "total_supply": str(total),
+    }
+
+
+database.add_observer(_before_commit, _after_commit)
@@ -0,0 +1,166 @@
+"""
+Topic-dispatched decoder for SimpleERC1400 IssuedByPartition / TransferByPartition logs.
+
+Each event's decoders are built once at import and looked up by topic0:
+indexed topics are converted straight from their 32-byte words, and the data
+section goes through a precompiled eth_abi tuple decoder. There is no web3
+event machinery and no exception-driven matching of non-matching logs.
+Checksummed addresses are memoized, since the same token / operator / holder
+addresses recur across a backfill. Large batches can be fanned out to a
+process pool.
+
+This module only depends on eth_abi / eth_utils so pool workers import it
+cheaply.
+"""
+
+import json
+import os
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from eth_abi.abi import default_codec
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'artifacts', 'SimpleERC1400.json')
+INDEXED_EVENTS = ("IssuedByPartition", "TransferByPartition")
+PARALLEL_DECODE_THRESHOLD = 5000  # Smaller batches are not worth pickling to workers
+
+
+def hex_str(value) -> str:
+    """Normalize topics / hashes (bytes or hex strings) to lowercase 0x-hex."""
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    value = str(value).lower()
+    return value if value.startswith('0x') else '0x' + value
+
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    value = str(value)
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def _load_event_abis():
+    with open(ARTIFACT_PATH, 'r') as f:
+        abi = json.load(f)['abi']
+    events = [e for e in abi if e.get('type') == 'event' and e.get('name') in INDEXED_EVENTS]
+    return {'0x' + event_abi_to_log_topic(e).hex(): e for e in events}
+
+
+# Checksumming hashes the address; the same addresses recur across logs
+_checksum = lru_cache(maxsize=65536)(to_checksum_address)
+
+
+def _word_decoder(abi_type: str):
+    """Converter for one indexed topic word of a static ABI type."""
+    if abi_type == 'address':
+        return lambda word: _checksum('0x' + word[12:].hex())
+    if abi_type == 'bytes32':
+        return bytes
+    if abi_type.startswith('uint'):
+        return lambda word: int.from_bytes(word, 'big')
+    if abi_type == 'bool':
+        return lambda word: word[-1] == 1
+    decoder = default_codec._registry.get_tuple_decoder(abi_type)
+    return lambda word: decoder(default_codec.stream_class(word))[0]
+
+
+def _compile(event_abi: dict) -> dict:
+    """Precompute the topic converters, data decoder and argument names of one event."""
+    indexed = [i for i in event_abi['inputs'] if i.get('indexed')]
+    data = [i for i in event_abi['inputs'] if not i.get('indexed')]
+    return {
+        'name': event_abi['name'],
+        'topic_count': len(indexed) + 1,
+        'indexed': [(i['name'], _word_decoder(i['type'])) for i in indexed],
+        'data_names': [i['name'] for i in data],
+        'data_types': [i['type'] for i in data],
+        'data_decoder': default_codec._registry.get_tuple_decoder(*[i['type'] for i in data]),
+    }
+
+
+# topic0 -> event ABI / precompiled decoder, computed once at import
+TOPIC_EVENTS = _load_event_abis()
+DECODERS = {topic: _compile(abi) for topic, abi in TOPIC_EVENTS.items()}
+
+
+def decode_partition(partition: bytes) -> str:
+    """bytes32 partition -> label (falls back to hex for non-UTF-8 values)."""
+    try:
+        return partition.rstrip(b'\x00').decode('utf-8')
+    except UnicodeDecodeError:
+        return '0x' + partition.hex()
+
+
+def decode_log(log):
+    """
+    Decode a raw log into an event dict, or None if it is not an indexed event.
+
+    Returns:
+        dict: {'event', 'contract_address', 'partition', 'operator', 'from',
+               'to', 'value', 'tx_hash', 'log_index', 'block_number', 'block_hash'}
+    """
+    topics = log.get('topics') or []
+    if not topics:
+        return None
+    decoder = DECODERS.get(hex_str(topics[0]))
+    if decoder is None or len(topics) != decoder['topic_count']:
+        return None
+
+    args = {name: convert(_to_bytes(topic)) for (name, convert), topic in zip(decoder['indexed'], topics[1:])}
+    data = decoder['data_decoder'](default_codec.stream_class(_to_bytes(log.get('data') or b'')))
+    for name, abi_type, value in zip(decoder['data_names'], decoder['data_types'], data):
+        args[name] = _checksum(value) if abi_type == 'address' else value
+
+    partition = args['partition'] if decoder['name'] == 'IssuedByPartition' else args['fromPartition']
+    return {
+        'event': decoder['name'],
+        'contract_address': _checksum(str(log['address']).lower()),
+        'partition': decode_partition(partition),
+        'operator': args['operator'],
+        'from': args.get('from'),
+        'to': args['to'],
+        'value': int(args['value']),
+        'tx_hash': hex_str(log['transactionHash']),
+        'log_index': int(log['logIndex']),
+        'block_number': int(log['blockNumber']),
+        'block_hash': hex_str(log['blockHash']),
+    }
+
+
+def decode_batch(logs: list) -> list:
+    """Decode a list of logs, dropping the ones that are not indexed events."""
+    return [e for e in (decode_log(log) for log in logs) if e]
+
+
+_pool = None
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None or _pool._max_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def decode_logs(logs: list, workers: int = 0) -> list:
+    """
+    Decode a batch of logs, in input order.
+
+    Args:
+        logs: Raw logs as returned by eth_getLogs.
+        workers: Processes to fan a large batch out to (0 decodes in-process).
+    """
+    if workers <= 1 or len(logs) < PARALLEL_DECODE_THRESHOLD:
+        return decode_batch(logs)
+
+    # Plain dicts pickle faster than web3 AttributeDicts
+    plain = [dict(log) for log in logs]
+    size = -(-len(plain) // workers)
+    slices = [plain[i:i + size] for i in range(0, len(plain), size)]
+    events = []
+    for batch in _get_pool(workers).map(decode_batch, slices):
+        events.extend(batch)
+    return events
@@ -0,0 +1,79 @@
+"""
+Off-chain rewards payout simulation.
+
+Mirrors the rewards contract's claimable() arithmetic,
+`deposit * balanceAtSnapshot / totalSnapshotSupply` with integer (floor)
+division, for every holder of the local ledger snapshot in one vectorized
+pass. Amounts are uint256-sized, so the math runs on int64 only when every
+product provably fits and on exact Python-int object arrays otherwise.
+"""
+
+from backend.services import ledger
+
+INT64_MAX = 2 ** 63 - 1
+
+
+def compute_payouts(balances, deposit: int, total_supply: int):
+    """
+    Vectorized floor(deposit * balance / total_supply).
+
+    Args:
+        balances: Sequence of holder balances in base units.
+        deposit: Reward amount being deposited, in reward-token base units.
+        total_supply: Snapshot supply the contract divides by.
+
+    Returns:
+        tuple: (payouts as a NumPy array, rounding dust left in the contract)
+    """
+    import numpy as np  # Deferred: only simulations need it
+
+    if total_supply <= 0:
+        raise ValueError("Snapshot supply must be positive")
+    values = np.array(balances, dtype=object)
+    if values.size == 0:
+        return values, deposit
+
+    if deposit * int(values.max()) <= INT64_MAX:
+        payouts = values.astype(np.int64) * deposit // total_supply
+    else:
+        payouts = values * deposit // total_supply
+    dust = deposit - int(payouts.sum())
+    return payouts, dust
+
+
+def simulate(chain_id: str, contract_address: str, deposit: int, block: int, total_supply: int = None) -> dict:
+    """
+    Expected payout of every holder in the ledger snapshot at `block`.
+
+    Args:
+        chain_id: Chain of the token.
+        contract_address: Token / rewards contract address.
+        deposit: Reward amount to deposit, in base units.
+        block: Snapshot block.
+        total_supply: On-chain totalSnapshotSupply; defaults to the ledger total.
+
+    Returns:
+        dict: {'block', 'deposit', 'total_supply', 'ledger_supply', 'holder_count',
+               'total_paid', 'dust', 'payouts': [{'address', 'balance', 'payout'}]}
+               with amounts as base-unit strings.
+    """
+    snap = ledger.snapshot(chain_id, contract_address, block)
+    addresses = [h["address"] for h in snap["holders"]]
+    balances = [int(h["value"]) for h in snap["holders"]]
+    ledger_supply = int(snap["total_supply"])
+    supply = ledger_supply if total_supply is None else int(total_supply)
+
+    payouts, dust = compute_payouts(balances, deposit, supply)
+    return {
+        "block": block,
+        "deposit": str(deposit),
+        "total_supply": str(supply),
+        "ledger_supply": str(ledger_supply),
+        "holder_count": len(addresses),
+        "total_paid": str(deposit - dust),
+        "dust": str(dust),
+        "payouts": [
+            {"address": address, "balance": str(balance), "payout": str(payout)}
+            for address, balance, payout in zip(addresses, balances, payouts.tolist())
+        ],
+    }
@@ -0,0 +1,277 @@
+"""
+Resilience layer for upstream calls (Cobo WaaS and chain RPC endpoints).
+
+- Classified retries: only rate limits (429), server errors (5xx), timeouts and
+  connection failures are retried; anything else fails immediately.
+- Jittered exponential backoff ("full jitter") between attempts.
+- Per-upstream circuit breakers that fail fast while an upstream is degraded.
+- Deadline propagation: a per-request deadline (set by the HTTP middleware) is
+  carried in a context variable; retries stop and per-attempt timeouts shrink
+  as it approaches.
+"""
+
+import asyncio
+import contextvars
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.config.settings import settings
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("upstream_deadline", default=None)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream that cannot answer in time."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    def __init__(self, upstream: str, retry_in: float):
+        super().__init__(f"Upstream '{upstream}' is unavailable (circuit open, retry in {retry_in:.1f}s)")
+        self.upstream = upstream
+        self.retry_in = retry_in
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    def __init__(self, upstream: str):
+        super().__init__(f"Request deadline exceeded before '{upstream}' answered")
+        self.upstream = upstream
+
+
+class RetryableStatus(Exception):
+    """An HTTP response with a retryable status, raised so it can be retried."""
+
+    def __init__(self, status: int, response=None):
+        super().__init__(f"Upstream returned HTTP {status}")
+        self.status = status
+        self.response = response
+
+
+# --- Deadlines ---
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Bound every upstream call made in this context to `seconds` from now."""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """Seconds left before the current deadline, or None if there is none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def attempt_timeout(default: float) -> float:
+    """Timeout for a single attempt: the default, capped by the remaining deadline."""
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    return max(0.001, min(default, remaining))
+
+
+# --- Classification ---
+
+def status_of(exc: Exception):
+    """Best-effort HTTP status of an upstream exception."""
+    if isinstance(exc, RetryableStatus):
+        return exc.status
+    status = getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(exc: Exception, idempotent: bool = True) -> bool:
+    """
+    Whether an upstream failure is transient and worth another attempt.
+
+    Non-idempotent calls (e.g. creating a Cobo transaction) are only retried
+    on 429, where the upstream guarantees the request was not processed.
+    """
+    status = status_of(exc)
+    if status is not None:
+        if status == 429:
+            return True
+        return idempotent and status in RETRYABLE_STATUS
+    if not idempotent:
+        return False
+    transient = (
+        TimeoutError,
+        asyncio.TimeoutError,
+        socket.timeout,
+        ConnectionError,
+    )
+    # HTTP client libraries are imported by whichever client raised; don't pay for them here
+    try:
+        import requests
+        import urllib3
+        transient += (
+            requests.Timeout,
+            requests.ConnectionError,
+            urllib3.exceptions.TimeoutError,
+            urllib3.exceptions.ProtocolError,
+            urllib3.exceptions.NewConnectionError,
+            urllib3.exceptions.MaxRetryError,
+        )
+    except ImportError:
+        pass
+    try:
+        import aiohttp
+        transient += (aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError)
+    except ImportError:
+        pass
+    return isinstance(exc, transient)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+    cap = min(settings.upstream_retry_max_delay, settings.upstream_retry_base_delay * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+# --- Circuit breakers ---
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive transient failures.
+    Open -> half-open after `reset_timeout` seconds, letting one probe through.
+    Half-open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.circuit_failure_threshold
+        self.reset_timeout = reset_timeout or settings.circuit_reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.reset_timeout:
+                    raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open":
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⚠️ Circuit for '{self.name}' opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    breaker = _breakers.get(upstream)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(upstream, CircuitBreaker(upstream))
+    return breaker
+
+
+def breaker_states() -> dict:
+    """Current state of every circuit breaker, for diagnostics."""
+    return {name: b.snapshot() for name, b in list(_breakers.items())}
+
+
+# --- Call wrappers ---
+
+def _next_delay(upstream: str, attempt: int, attempts: int, exc: Exception, idempotent: bool):
+    """Delay before the next attempt, or None if the error should be raised."""
+    if attempt >= attempts - 1 or not is_retryable(exc, idempotent):
+        return None
+    delay = backoff_delay(attempt)
+    remaining = remaining_time()
+    if remaining is not None and remaining <= delay:
+        return None
+    print(f"Retrying {upstream} in {delay:.2f}s after: {exc}")
+    return delay
+
+
+def call(upstream: str, fn, *args, idempotent: bool = True, attempts: int = None, **kwargs):
+    """Call `fn` through the circuit breaker and retry policy of `upstream`."""
+    breaker = get_breaker(upstream)
+    attempts = attempts or settings.upstream_retry_attempts
+    for attempt in range(attempts):
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(upstream)
+        breaker.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_retryable(e, idempotent=True):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            delay = _next_delay(upstream, attempt, attempts, e, idempotent)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+async def acall(upstream: str, fn, *args, idempotent: bool = True, attempts: int = None, **kwargs):
+    """Async counterpart of call(); `fn` is a coroutine function."""
+    breaker = get_breaker(upstream)
+    attempts = attempts or settings.upstream_retry_attempts
+    for attempt in range(attempts):
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(upstream)
+        breaker.before_call()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            if is_retryable(e, idempotent=True):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            delay = _next_delay(upstream, attempt, attempts, e, idempotent)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
@@ -9,14 +9,27 @@ This service handles interactions with the rewards distribution contract:
 
 import json
 import os
-from web3 import Web3
-from backend.services.cobo_service import cobo_client
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from backend.config.settings import settings
+from backend.services.lazy import LazyObject
+from backend.services.rpc_service import get_web3
+from backend.services.resilience import UpstreamUnavailable
+from backend.services import single_flight
+from backend.services.executors import RPC, run_blocking
+
+# The Cobo SDK is only imported by the first write
+cobo_client = LazyObject("backend.services.cobo_service", "cobo_client")
 
-# Load ABI
 ABI_PATH = os.path.join(os.path.dirname(__file__), '../artifacts/CoboERC20TestVotesABI.json')
-with open(ABI_PATH, 'r') as f:
-    abi_data =json.load(f)
-    REWARDS_ABI = abi_data['abi']
+
+
+@lru_cache(maxsize=None)
+def rewards_abi():
+    """The rewards contract ABI, loaded on first use."""
+    with open(ABI_PATH, 'r') as f:
+        return json.load(f)['abi']
 
 # ERC20 ABI for approve function
 ERC20_ABI = [
@@ -43,16 +56,6 @@ ERC20_ABI = [
     }
 ]
 
-# Chain ID to RPC mapping (using Cobo chain ID conventions)
-CHAIN_RPC_URLS = {
-    "ETH_SEPOLIA": "https://ethereum-sepolia-rpc.publicnode.com",  # Internal: ETH_SEPOLIA → Cobo: SETH
-    "SETH": "https://ethereum-sepolia-rpc.publicnode.com",  # Direct Cobo chain ID
-    "ETH": "https://ethereum-rpc.publicnode.com",
-    "MATIC_POLYGON": "https://polygon-rpc.com",
-    "MATIC": "https://polygon-rpc.com",  # Direct Cobo chain ID
-    "BSC_BNB": "https://bsc-dataseed.binance.org",
-}
-
 def map_chain_id(chain_id: str) -> str:
     """Map internal chain IDs to Cobo API chain IDs."""
     mapping = {
@@ -61,17 +64,12 @@ def map_chain_id(chain_id: str) -> str:
     }
     return mapping.get(chain_id, chain_id)
 
-def get_web3(chain_id: str):
-    """Get Web3 instance for the given chain."""
-    rpc_url = CHAIN_RPC_URLS.get(chain_id)
-    if not rpc_url:
-        raise ValueError(f"Unsupported chain: {chain_id}")
-    return Web3(Web3.HTTPProvider(rpc_url))
-
-
 def get_rewards_info(contract_address: str, chain_id: str = "ETH_SEPOLIA"):
     """
     Get current rewards configuration and status.
+
+    Identical concurrent lookups (e.g. many dashboards open on one token)
+    share one set of RPC reads.
     
     Returns:
         dict: {
@@ -81,9 +79,25 @@ def get_rewards_info(contract_address: str, chain_id: str = "ETH_SEPOLIA"):
             'totalRewardAmount': int
         }
     """
+    key = (chain_id, contract_address.lower())
+    return single_flight.group("rewards:info").do(key, _read_rewards_info, contract_address, chain_id)
+
+
+async def aget_rewards_info(contract_address: str, chain_id: str = "ETH_SEPOLIA"):
+    """
+    get_rewards_info for async endpoints: the reads run on an RPC worker and
+    callers joining them wait on the event loop without holding a thread.
+    """
+    key = (chain_id, contract_address.lower())
+    return await single_flight.group("rewards:info").ado(
+        key, run_blocking, RPC, _read_rewards_info, contract_address, chain_id
+    )
+
+
+def _read_rewards_info(contract_address: str, chain_id: str):
     try:
         w3 = get_web3(chain_id)
-        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=REWARDS_ABI)
+        contract = w3.eth.contract(address=w3.to_checksum_address(contract_address), abi=rewards_abi())
         
         reward_token = contract.functions.rewardToken().call()
         snapshot_block = contract.functions.snapshotBlock().call()
@@ -97,6 +111,8 @@ def get_rewards_info(contract_address: str, chain_id: str = "ETH_SEPOLIA"):
             "totalRewardAmount": str(total_reward_amount),
             "currentBlock": w3.eth.block_number
         }
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to get rewards info: {str(e)}")
 
@@ -113,11 +129,60 @@ def get_claimable(contract_address: str, investor_address: str, chain_id: str =
     Returns:
         dict: {'claimable': str, 'claimed': str}
     """
+    key = (chain_id, contract_address.lower(), investor_address.lower())
+    return single_flight.group("rewards:claimable").do(key, _read_claimable, contract_address, investor_address, chain_id)
+
+
+async def aget_claimable(contract_address: str, investor_address: str, chain_id: str = "ETH_SEPOLIA"):
+    """get_claimable for async endpoints (see aget_rewards_info)."""
+    key = (chain_id, contract_address.lower(), investor_address.lower())
+    return await single_flight.group("rewards:claimable").ado(
+        key, run_blocking, RPC, _read_claimable, contract_address, investor_address, chain_id
+    )
+
+
+# (chain, contract, investor) -> (expiry, result), least recently used first;
+# see cached_claimable()
+_claimable_cache = OrderedDict()
+
+
+async def cached_claimable(contract_address: str, investor_address: str, chain_id: str = "ETH_SEPOLIA"):
+    """
+    get_claimable for read-mostly views, cached for settings.claimable_cache_ttl.
+
+    Contracts without a rewards interface fail the same way every time, so
+    failures are cached too, as {'error': ...}; only an unavailable upstream
+    is not.
+    """
+    key = (chain_id, contract_address.lower(), investor_address.lower())
+    cached = _claimable_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        _claimable_cache.move_to_end(key)
+        return cached[1]
+    try:
+        result = await aget_claimable(contract_address, investor_address, chain_id)
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        result = {"error": str(e)}
+    now = time.monotonic()
+    _claimable_cache[key] = (now + settings.claimable_cache_ttl, result)
+    _claimable_cache.move_to_end(key)
+    # Expired entries go first, then the least recently used past the size bound
+    while _claimable_cache:
+        oldest_key, (expiry, _) = next(iter(_claimable_cache.items()))
+        if expiry > now and len(_claimable_cache) <= settings.claimable_cache_size:
+            break
+        del _claimable_cache[oldest_key]
+    return result
+
+
+def _read_claimable(contract_address: str, investor_address: str, chain_id: str):
     try:
         w3 = get_web3(chain_id)
-        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=REWARDS_ABI)
+        contract = w3.eth.contract(address=w3.to_checksum_address(contract_address), abi=rewards_abi())
         
-        investor_addr = Web3.to_checksum_address(investor_address)
+        investor_addr = w3.to_checksum_address(investor_address)
         claimable_amount = contract.functions.claimable(investor_addr).call()
         claimed_amount = contract.functions.claimed(investor_addr).call()
         
@@ -126,6 +191,8 @@ def get_claimable(contract_address: str, investor_address: str, chain_id: str =
             "claimed": str(claimed_amount),
             "investor": investor_address
         }
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to get claimable amount: {str(e)}")
 
@@ -148,11 +215,11 @@ def set_reward_token(contract_address: str, reward_token_address: str, wallet_id
         api_chain_id = map_chain_id(chain_id)
         
         w3 = get_web3(chain_id)
-        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=REWARDS_ABI)
+        contract = w3.eth.contract(address=w3.to_checksum_address(contract_address), abi=rewards_abi())
         
         # Encode function call
         calldata = contract.functions.setRewardToken(
-            Web3.to_checksum_address(reward_token_address)
+            w3.to_checksum_address(reward_token_address)
         ).build_transaction({
             'from': '0x0000000000000000000000000000000000000000',  # Dummy for encoding
             'gas': 100000,
@@ -169,6 +236,8 @@ def set_reward_token(contract_address: str, reward_token_address: str, wallet_id
         )
         
         return tx_id
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to set reward token: {str(e)}")
 
@@ -191,7 +260,7 @@ def take_snapshot(contract_address: str, wallet_id: str, chain_id: str = "ETH_SE
         api_chain_id = map_chain_id(chain_id)
         
         w3 = get_web3(chain_id)
-        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=REWARDS_ABI)
+        contract = w3.eth.contract(address=w3.to_checksum_address(contract_address), abi=rewards_abi())
         
         # Encode function call
         calldata = contract.functions.takeSnapshot().build_transaction({
@@ -210,6 +279,8 @@ def take_snapshot(contract_address: str, wallet_id: str, chain_id: str = "ETH_SE
         )
         
         return tx_id
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to take snapshot: {str(e)}")
 
@@ -223,17 +294,19 @@ def check_allowance(reward_token_address: str, owner_address: str, spender_addre
     """
     try:
         w3 = get_web3(chain_id)
-        token_contract = w3.eth.contract(address=Web3.to_checksum_address(reward_token_address), abi=ERC20_ABI)
+        token_contract = w3.eth.contract(address=w3.to_checksum_address(reward_token_address), abi=ERC20_ABI)
         
         # Map chain ID for Cobo API calls
         api_chain_id = map_chain_id(chain_id)
         
         allowance = token_contract.functions.allowance(
-            Web3.to_checksum_address(owner_address),
-            Web3.to_checksum_address(spender_address)
+            w3.to_checksum_address(owner_address),
+            w3.to_checksum_address(spender_address)
         ).call()
         
         return allowance
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to check allowance: {str(e)}")
 
@@ -254,11 +327,11 @@ def approve_reward_token(reward_token_address: str, spender_address: str, amount
     """
     try:
         w3 = get_web3(chain_id)
-        token_contract = w3.eth.contract(address=Web3.to_checksum_address(reward_token_address), abi=ERC20_ABI)
+        token_contract = w3.eth.contract(address=w3.to_checksum_address(reward_token_address), abi=ERC20_ABI)
         
         # Encode approve function call
         calldata = token_contract.functions.approve(
-            Web3.to_checksum_address(spender_address),
+            w3.to_checksum_address(spender_address),
             amount
         ).build_transaction({
             'from': '0x0000000000000000000000000000000000000000',
@@ -276,6 +349,8 @@ def approve_reward_token(reward_token_address: str, spender_address: str, amount
         )
         
         return tx_id
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to approve reward token: {str(e)}")
 
@@ -322,7 +397,7 @@ def deposit_rewards(contract_address: str, amount: int, wallet_id: str, chain_id
         
         # Encode depositRewards function call
         w3 = get_web3(chain_id)
-        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=REWARDS_ABI)
+        contract = w3.eth.contract(address=w3.to_checksum_address(contract_address), abi=rewards_abi())
         
         calldata = contract.functions.depositRewards(amount).build_transaction({
             'from': '0x0000000000000000000000000000000000000000',
@@ -342,6 +417,8 @@ def deposit_rewards(contract_address: str, amount: int, wallet_id: str, chain_id
         result['deposit_tx_id'] = deposit_tx_id
         return result
         
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to deposit rewards: {str(e)}")
 
@@ -360,7 +437,7 @@ def claim_rewards(contract_address: str, wallet_id: str, chain_id: str = "ETH_SE
     """
     try:
         w3 = get_web3(chain_id)
-        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=REWARDS_ABI)
+        contract = w3.eth.contract(address=w3.to_checksum_address(contract_address), abi=rewards_abi())
         
         # Encode claim function call
         calldata = contract.functions.claim().build_transaction({
@@ -379,6 +456,8 @@ def claim_rewards(contract_address: str, wallet_id: str, chain_id: str = "ETH_SE
         )
         
         return tx_id
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to claim rewards: {str(e)}")
 
@@ -406,11 +485,11 @@ def delegate_tokens(token_contract_address: str, delegatee_address: str, wallet_
         }]
         
         w3 = get_web3(chain_id)
-        contract = w3.eth.contract(address=Web3.to_checksum_address(token_contract_address), abi=delegate_abi)
+        contract = w3.eth.contract(address=w3.to_checksum_address(token_contract_address), abi=delegate_abi)
         
         # Encode delegate function call
         calldata = contract.functions.delegate(
-            Web3.to_checksum_address(delegatee_address)
+            w3.to_checksum_address(delegatee_address)
         ).build_transaction({
             'from': '0x0000000000000000000000000000000000000000',
             'gas': 100000,
@@ -427,5 +506,7 @@ def delegate_tokens(token_contract_address: str, delegatee_address: str, wallet_
         )
         
         return tx_id
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise Exception(f"Failed to delegate tokens: {str(e)}")
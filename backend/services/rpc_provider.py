@@ -0,0 +1,69 @@
+"""
+Web3 HTTP provider that routes chain RPC requests through the resilience layer.
+
+Kept apart from rpc_service so web3 is only imported once a chain is used.
+"""
+
+import json
+from web3.providers.rpc import HTTPProvider
+from web3._utils.batching import sort_batch_response_by_response_ids
+from backend.config.settings import settings
+from backend.services import resilience
+from backend.services import single_flight
+
+# Read-only methods whose identical concurrent requests to one endpoint share
+# a single upstream call
+COALESCED_RPC_METHODS = {
+    "eth_call",
+    "eth_blockNumber",
+    "eth_chainId",
+    "eth_getTransactionReceipt",
+    "eth_getTransactionByHash",
+    "eth_getBlockByNumber",
+    "eth_getBlockByHash",
+    "eth_getBalance",
+    "eth_getCode",
+}
+
+
+class ResilientHTTPProvider(HTTPProvider):
+    """
+    HTTPProvider that routes requests through the resilience layer.
+
+    Web3's own fixed-interval retry is disabled: it retries 4xx responses and
+    has no jitter or circuit breaking.
+    """
+
+    def __init__(self, endpoint_uri: str, upstream: str, timeout: float = None, **kwargs):
+        kwargs.setdefault("exception_retry_configuration", None)
+        super().__init__(endpoint_uri, **kwargs)
+        self.upstream = upstream
+        self.timeout = timeout or settings.rpc_request_timeout
+
+    def get_request_kwargs(self):
+        request_kwargs = dict(super().get_request_kwargs())
+        request_kwargs["timeout"] = resilience.attempt_timeout(self.timeout)
+        return request_kwargs
+
+    def _post(self, request_data: bytes) -> bytes:
+        return self._request_session_manager.make_post_request(
+            self.endpoint_uri, request_data, **self.get_request_kwargs()
+        )
+
+    def make_request(self, method, params):
+        if method not in COALESCED_RPC_METHODS:
+            return super().make_request(method, params)
+        key = (self.endpoint_uri, method, json.dumps(params, sort_keys=True, default=repr))
+        return single_flight.group("rpc").do(key, super().make_request, method, params)
+
+    def _make_request(self, method, request_data: bytes) -> bytes:
+        return resilience.call(self.upstream, self._post, request_data)
+
+    def make_batch_request(self, batch_requests):
+        request_data = self.encode_batch_rpc_request(batch_requests)
+        raw_response = resilience.call(self.upstream, self._post, request_data)
+        response = self.decode_rpc_response(raw_response)
+        if not isinstance(response, list):
+            # RPC errors return only one response with the error object
+            return response
+        return sort_batch_response_by_response_ids(response)
@@ -0,0 +1,90 @@
+"""
+Chain RPC access for the backend.
+
+All Web3 instances are built here so every RPC call goes through the
+resilience layer (classified retries, per-endpoint circuit breakers and the
+request deadline) and reuses one pooled HTTP session per chain.
+
+web3 itself is only imported when the first instance is built, so importing
+this module (e.g. for CHAIN_RPC_URLS) stays cheap on a cold start.
+"""
+
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+# Chain ID to RPC mapping (using Cobo chain ID conventions)
+CHAIN_RPC_URLS = {
+    "ETH_SEPOLIA": "https://ethereum-sepolia-rpc.publicnode.com",  # Internal: ETH_SEPOLIA → Cobo: SETH
+    "SETH": "https://ethereum-sepolia-rpc.publicnode.com",  # Direct Cobo chain ID
+    "ETH": "https://ethereum-rpc.publicnode.com",
+    "MATIC_POLYGON": "https://polygon-rpc.com",
+    "MATIC": "https://polygon-rpc.com",  # Direct Cobo chain ID
+    "BSC_BNB": "https://bsc-dataseed.binance.org",
+}
+
+# Additional public endpoints per chain. Bulk work such as the event backfill
+# spreads requests over these; interactive calls stay on CHAIN_RPC_URLS.
+CHAIN_RPC_FALLBACK_URLS = {
+    "ETH_SEPOLIA": ["https://sepolia.drpc.org"],
+    "SETH": ["https://sepolia.drpc.org"],
+    "ETH": ["https://eth.drpc.org"],
+    "MATIC_POLYGON": ["https://polygon-bor-rpc.publicnode.com"],
+    "MATIC": ["https://polygon-bor-rpc.publicnode.com"],
+    "BSC_BNB": [
+        "https://bsc-rpc.publicnode.com",
+        "https://bsc-dataseed1.defibit.io",
+        "https://bsc-dataseed1.ninicoin.io",
+    ],
+}
+
+_web3_instances = {}
+_web3_lock = threading.Lock()
+
+
+def rpc_upstream(endpoint_uri: str) -> str:
+    """Circuit breaker name for an RPC endpoint."""
+    return f"rpc:{endpoint_uri}"
+
+
+def rpc_endpoints(chain_id: str) -> list:
+    """Every RPC endpoint configured for a chain, primary first."""
+    rpc_url = CHAIN_RPC_URLS.get(chain_id)
+    if not rpc_url:
+        raise ValueError(f"Unsupported chain: {chain_id}")
+    endpoints = [rpc_url]
+    for url in CHAIN_RPC_FALLBACK_URLS.get(chain_id, []):
+        if url not in endpoints:
+            endpoints.append(url)
+    return endpoints
+
+
+def _endpoint_web3(rpc_url: str) -> "Web3":
+    """Shared Web3 instance for one endpoint URL."""
+    w3 = _web3_instances.get(rpc_url)
+    if w3 is not None:
+        return w3
+
+    with _web3_lock:
+        w3 = _web3_instances.get(rpc_url)
+        if w3 is None:
+            from web3 import Web3
+            from backend.services.rpc_provider import ResilientHTTPProvider
+
+            # Chains sharing an endpoint (e.g. MATIC / MATIC_POLYGON) share a breaker
+            provider = ResilientHTTPProvider(rpc_url, upstream=rpc_upstream(rpc_url))
+            w3 = Web3(provider)
+            _web3_instances[rpc_url] = w3
+    return w3
+
+
+def get_web3(chain_id: str) -> "Web3":
+    """Get the shared Web3 instance for the given chain."""
+    return _endpoint_web3(rpc_endpoints(chain_id)[0])
+
+
+def get_web3_pool(chain_id: str) -> list:
+    """Web3 instances for every endpoint of a chain, primary first."""
+    return [_endpoint_web3(url) for url in rpc_endpoints(chain_id)]
@@ -0,0 +1,41 @@
+"""
+Fast JSON encoding of API responses.
+
+FastAPI's default path runs every response through `jsonable_encoder` (a
+recursive Python walk) and then `json.dumps`. For the large lists this API
+returns (tokens, holders, snapshots) that is most of the request time.
+FastJSONResponse encodes with orjson instead, and an endpoint that returns
+one directly skips `jsonable_encoder` as well.
+
+Payloads that are already encoded (e.g. the contract artifacts) are served
+as bytes with bytes_response().
+"""
+
+import json
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+
+def dumps(content) -> bytes:
+    """orjson encoding, falling back to the standard encoder for what orjson rejects."""
+    try:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    except TypeError:
+        # Integers beyond 64 bits, Pydantic models and other non-native types
+        return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by orjson (like FastAPI's ORJSONResponse), degrading
+    to the standard encoder instead of failing.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def bytes_response(payload: bytes, status_code: int = 200, headers: dict = None) -> Response:
+    """Serve already-encoded JSON as is."""
+    return Response(content=payload, status_code=status_code, headers=headers, media_type="application/json")
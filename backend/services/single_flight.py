@@ -0,0 +1,124 @@
+"""
+Request coalescing ("single flight") for identical concurrent upstream reads.
+
+While a call for a key is in flight, later callers with the same key wait
+for it and share its result (or exception) instead of issuing their own
+upstream request. Nothing is cached: once the call finishes, the next caller
+starts a new one.
+
+Keys name the upstream call, e.g. (endpoint, method, params) for a chain RPC
+read or the transaction ID for a Cobo status lookup. Waiting callers still
+honour their own request deadline.
+
+Each group counts calls, upstream executions and collapsed calls; see stats().
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from backend.services import resilience
+
+
+class SingleFlight:
+    """One coalescing namespace (e.g. "rpc" or "cobo:transaction")."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executed = 0
+        self.collapsed = 0
+        self._futures = {}  # key -> concurrent Future (threaded callers)
+        self._tasks = {}    # key -> asyncio Task (async callers)
+        self._lock = threading.Lock()
+
+    def _wait_timeout(self):
+        remaining = resilience.remaining_time()
+        return None if remaining is None else max(0.0, remaining)
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Call `fn(*args, **kwargs)`, or join an identical call already in flight.
+
+        Args:
+            key: Hashable identity of the upstream call.
+            fn: Blocking callable.
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._futures[key] = future
+                self.executed += 1
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            try:
+                return future.result(timeout=self._wait_timeout())
+            except FutureTimeoutError:
+                raise resilience.DeadlineExceeded(self.name)
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._futures.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._futures.pop(key, None)
+        future.set_result(result)
+        return result
+
+    async def ado(self, key, fn, *args, **kwargs):
+        """
+        Async counterpart of do(); `fn` is a coroutine function.
+
+        The call runs as its own task, so a caller that is cancelled (e.g. a
+        disconnected client) does not cancel it for the others.
+        """
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                self._tasks[key] = task
+                self.executed += 1
+                task.add_done_callback(lambda _, key=key: self._tasks.pop(key, None))
+            else:
+                self.collapsed += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=self._wait_timeout())
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise resilience.DeadlineExceeded(self.name)
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._futures) + len(self._tasks),
+        }
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def group(name: str) -> SingleFlight:
+    """The shared coalescing group for a name, created on first use."""
+    flight = _groups.get(name)
+    if flight is None:
+        with _groups_lock:
+            flight = _groups.setdefault(name, SingleFlight(name))
+    return flight
+
+
+def stats() -> dict:
+    """Call / execution / collapse counters of every group, for diagnostics."""
+    return {name: flight.snapshot() for name, flight in list(_groups.items())}
@@ -1,121 +1,299 @@
+import argparse
 import json
-import os
-import sys
-from web3 import Web3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from cobo_waas2 import TransactionStatus
+from web3.exceptions import TransactionNotFound
+from backend import database
+from backend.config.settings import settings
 from backend.services.cobo_service import cobo_client
+from backend.services.confirmations import finality_depth
+from backend.services import issuance
+from backend.services.rpc_service import CHAIN_RPC_URLS, get_web3
 
-# Setup Paths
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "backend"))
-DB_FILE = os.path.join(BASE_DIR, "db.json")
-
-# Setup Web3
-BSC_RPC = "https://bsc-dataseed.binance.org/"
-w3 = Web3(Web3.HTTPProvider(BSC_RPC))
-
-def load_db():
-    if not os.path.exists(DB_FILE):
-        print(f"❌ DB file not found at {DB_FILE}")
-        return {"contracts": [], "mints": []}
-    with open(DB_FILE, "r") as f:
-        return json.load(f)
-
-def save_db(data):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-    print("💾 Database updated.")
-
-def verify_cobo_tx(tx_id):
-    try:
-        tx = cobo_client.get_transaction(tx_id)
-        if not tx:
-            return False
-        # Check if successful or pending (broadcasting)
-        status = str(tx.status)
-        return status in ["TransactionStatus.SUCCESS", "TransactionStatus.BROADCASTING", "TransactionStatus.PENDING_APPROVAL", "TransactionStatus.QUEUED"]
-    except Exception as e:
-        print(f"⚠️ Cobo check failed for {tx_id}: {e}")
-        return False # Assume invalid if not found or error
-
-def verify_chain_tx(tx_hash):
-    try:
-        receipt = w3.eth.get_transaction_receipt(tx_hash)
-        return receipt.status == 1
-    except Exception:
-        # If receipt not found, it might be dropped or invalid
+RECEIPT_BATCH_SIZE = 100  # Receipts per JSON-RPC batch request
+
+# Cobo statuses that mean the transaction will never land
+INVALID_COBO_STATUSES = {TransactionStatus.FAILED, TransactionStatus.REJECTED}
+
+# Cobo answered 404 for the transaction ID
+NOT_FOUND = "not_found"
+
+# States that are never re-verified
+FINAL_STATES = ("finalized", "invalid")
+
+
+def classify(record, id_field):
+    """
+    How a contract / mint record is verified.
+
+    Returns:
+        tuple: ("cobo", id), ("chain", chain_id, tx_hash), ("mock",) or ("malformed",)
+    """
+    tx_id = record.get(id_field) or ""
+    if id_field == "tx_hash" and record.get("cobo_id"):
+        return ("cobo", record["cobo_id"])
+    if tx_id.startswith("mock_"):
+        return ("mock",)
+    if tx_id.startswith("0x"):
+        return ("chain", record.get("chain_id"), tx_id.lower())
+    if tx_id and id_field == "tx_id":
+        # Assume Cobo UUID
+        return ("cobo", tx_id)
+    return ("malformed",)
+
+
+def fetch_receipts(chain_id, tx_hashes):
+    """
+    Receipts of many transactions, with JSON-RPC batches of RECEIPT_BATCH_SIZE.
+
+    A hash whose batch entry is an error (rate limit, "header not found",
+    backend timeout) is retried on its own; if that fails too it is left out
+    of the result, so its record is not judged this run.
+
+    Returns:
+        dict: {"head": block number, "receipts": {tx_hash: None (no receipt) or
+               {"success": bool, "block_number": int}}}
+    """
+    w3 = get_web3(chain_id)
+    head = w3.eth.block_number
+    receipts = {}
+    failed = []
+    for i in range(0, len(tx_hashes), RECEIPT_BATCH_SIZE):
+        chunk = tx_hashes[i:i + RECEIPT_BATCH_SIZE]
+        responses = w3.provider.make_batch_request([("eth_getTransactionReceipt", [h]) for h in chunk])
+        if not isinstance(responses, list):
+            raise Exception(f"Batch receipt lookup failed on {chain_id}: {responses.get('error')}")
+        for tx_hash, response in zip(chunk, responses):
+            if "error" in response:
+                failed.append(tx_hash)
+                continue
+            receipt = response.get("result")
+            receipts[tx_hash] = None if receipt is None else {
+                "success": int(receipt["status"], 16) == 1,
+                "block_number": int(receipt["blockNumber"], 16),
+            }
+    unchecked = 0
+    for tx_hash in failed:
+        try:
+            receipt = w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            receipts[tx_hash] = None
+            continue
+        except Exception as e:
+            print(f"⚠️ Receipt lookup of {tx_hash} on {chain_id} failed, checking it next run: {e}")
+            unchecked += 1
+            continue
+        receipts[tx_hash] = {"success": receipt["status"] == 1, "block_number": receipt["blockNumber"]}
+    print(f"⛓️  {chain_id}: {len(tx_hashes)} receipts in {-(-len(tx_hashes) // RECEIPT_BATCH_SIZE)} batch requests"
+          f" ({len(failed)} retried, {unchecked} unchecked)")
+    return {"head": head, "receipts": receipts}
+
+
+def fetch_cobo_statuses(transaction_ids):
+    """
+    Cobo status of each transaction ID, via bulk list lookups.
+
+    IDs missing from the bulk result are looked up one by one: a list
+    response can leave out a transaction Cobo does know, so only a 404
+    on the single lookup counts as not found.
+
+    Returns:
+        dict: transaction_id -> TransactionStatus, NOT_FOUND if Cobo does not
+              know it, or None if its single lookup failed
+    """
+    found = cobo_client.get_transactions(transaction_ids)
+    statuses = {tx_id: found[tx_id].status for tx_id in transaction_ids if tx_id in found}
+    missing = [tx_id for tx_id in transaction_ids if tx_id not in found]
+    for tx_id in missing:
+        try:
+            tx = cobo_client.find_transaction(tx_id)
+            statuses[tx_id] = NOT_FOUND if tx is None else tx.status
+        except Exception as e:
+            print(f"⚠️ Cobo lookup of {tx_id} failed: {e}")
+            statuses[tx_id] = None
+    not_found = sum(statuses[tx_id] == NOT_FOUND for tx_id in missing)
+    print(f"🏦 Cobo: {len(transaction_ids)} transactions, {len(found)} found in bulk, "
+          f"{len(missing)} looked up one by one ({not_found} not found)")
+    return statuses
+
+
+def verify_all(lookups):
+    """
+    Run every lookup group concurrently: one task per chain plus one for Cobo.
+
+    Args:
+        lookups: {"cobo": set(ids), chain_id: set(hashes), ...}
+
+    Returns:
+        dict: same keys -> lookup result; a group whose lookup failed maps to None.
+    """
+    results = {}
+
+    def run(key):
+        ids = sorted(lookups[key])
+        try:
+            if key == "cobo":
+                return key, fetch_cobo_statuses(ids)
+            return key, fetch_receipts(key, ids)
+        except Exception as e:
+            print(f"⚠️ {key} lookups failed, leaving its records untouched: {e}")
+            return key, None
+
+    with ThreadPoolExecutor(max_workers=settings.reconcile_concurrency) as executor:
+        for key, result in executor.map(run, [k for k, ids in lookups.items() if ids]):
+            results[key] = result
+    return results
+
+
+def verified_state(check, results):
+    """
+    New verification state for a record, or None if it could not be checked this run.
+
+    Cobo transactions are final once COMPLETED (Cobo waits for its own
+    confirmation threshold); chain transactions once the receipt is deeper
+    than the chain's finality depth. A transaction with no receipt yet may
+    still be in the mempool, so it stays pending (see receipt_missing).
+    """
+    kind = check[0]
+    if kind in ("mock", "malformed"):
+        return "invalid"
+    if kind == "cobo":
+        statuses = results.get("cobo")
+        if statuses is None:
+            return None
+        status = statuses.get(check[1])
+        if status == NOT_FOUND or status in INVALID_COBO_STATUSES:
+            return "invalid"
+        if status is None:
+            # Lookup failed: not evidence the transaction is gone, check again next run
+            return "pending"
+        return "finalized" if status == TransactionStatus.COMPLETED else "pending"
+
+    chain = results.get(check[1])
+    if chain is None:
+        return None
+    if check[2] not in chain["receipts"]:
+        return None
+    receipt = chain["receipts"][check[2]]
+    if receipt is None:
+        return "pending"
+    if not receipt["success"]:
+        return "invalid"
+    confirmations = chain["head"] - receipt["block_number"] + 1
+    return "finalized" if confirmations >= finality_depth(check[1]) else "pending"
+
+
+def receipt_missing(check, results) -> bool:
+    """Whether this run's chain lookup found no receipt for the record's transaction."""
+    if check[0] != "chain":
         return False
+    chain = results.get(check[1])
+    return chain is not None and check[2] in chain["receipts"] and chain["receipts"][check[2]] is None
+
+
+def reconcile(full=False):
+    """
+    Verify every non-final contract and mint and apply the state changes.
 
-def reconcile():
+    Only records that are unverified (new since the last run) or pending
+    are looked up, unless `full` is set. A record whose transaction has no
+    receipt is stamped `missing_since` and only becomes invalid once it has
+    been missing for `reconcile_receipt_timeout`. Each state change is streamed to
+    stdout as one JSON line, and the store is only written if something
+    was checked.
+
+    Returns:
+        list: The state changes, as printed.
+    """
     print("🔍 Starting Reconciliation...")
-    data = load_db()
-    
-    valid_contracts = []
-    valid_mints = []
-    
-    # 1. Reconcile Contracts
-    print(f"Checking {len(data.get('contracts', []))} contracts...")
-    for c in data.get("contracts", []):
-        is_valid = False
-        name = c.get("name", "Unknown")
-        
-        # Check based on type
-        if c.get("cobo_id"):
-            # Managed
-            if verify_cobo_tx(c["cobo_id"]):
-                is_valid = True
-            else:
-                print(f"❌ Removing Invalid Managed Contract: {name} (Cobo ID: {c['cobo_id']})")
-        
-        elif c.get("tx_hash") and c["tx_hash"].startswith("0x"):
-            # Self-Custody
-            if verify_chain_tx(c["tx_hash"]):
-                is_valid = True
-            else:
-                print(f"❌ Removing Invalid Self-Custody Contract: {name} (Tx: {c['tx_hash']})")
-        else:
-            # No ID or Hash? Invalid.
-            print(f"❌ Removing Malformed Contract: {name}")
-            
-        if is_valid:
-            valid_contracts.append(c)
-
-    # 2. Reconcile Mints
-    print(f"Checking {len(data.get('mints', []))} mints...")
-    for m in data.get("mints", []):
-        is_valid = False
-        tx_id = m.get("tx_id", "")
-        
-        if not tx_id:
-            continue
-            
-        if tx_id.startswith("mock_"):
-            # Mock data - User asked to "clean up", so maybe remove mocks?
-            # Let's assume we remove mocks if we are doing "onchain verification"
-            print(f"❌ Removing Mock Mint: {tx_id}")
-            is_valid = False
-        elif tx_id.startswith("0x"):
-            # Chain Hash
-            if verify_chain_tx(tx_id):
-                is_valid = True
-            else:
-                print(f"❌ Removing Failed/Missing Chain Mint: {tx_id}")
+    issuance.register()
+    started = time.monotonic()
+    data = database.load_db()
+
+    def due(record):
+        return full or database.verification_state(record) not in FINAL_STATES
+
+    contract_checks = {
+        database.contract_key(c): classify(c, "tx_hash")
+        for c in data.get("contracts", []) if due(c)
+    }
+    mint_checks = {
+        m.get("tx_id"): classify(m, "tx_id")
+        for m in data.get("mints", []) if due(m) and m.get("tx_id")
+    }
+    skipped = len(data.get("contracts", [])) + len(data.get("mints", [])) - len(contract_checks) - len(mint_checks)
+
+    # Group lookups: Cobo IDs in bulk, chain hashes by chain
+    lookups = {"cobo": set()}
+    for check in list(contract_checks.values()) + list(mint_checks.values()):
+        if check[0] == "cobo":
+            lookups["cobo"].add(check[1])
+        elif check[0] == "chain":
+            if check[1] not in CHAIN_RPC_URLS:
+                print(f"⚠️ No RPC for chain {check[1]}; skipping {check[2]}")
+                continue
+            lookups.setdefault(check[1], set()).add(check[2])
+
+    print(f"Checking {len(contract_checks)} contracts and {len(mint_checks)} mints ({skipped} final records skipped)...")
+    results = verify_all(lookups)
+    contract_states = {key: verified_state(check, results) for key, check in contract_checks.items()}
+    mint_states = {tx_id: verified_state(check, results) for tx_id, check in mint_checks.items()}
+    missing = {key for key, check in contract_checks.items() if receipt_missing(check, results)} | \
+        {tx_id for tx_id, check in mint_checks.items() if receipt_missing(check, results)}
+
+    changes = []
+    checked = {key for key, state in contract_states.items() if state} | \
+        {tx_id for tx_id, state in mint_states.items() if state}
+    if not checked:
+        print(f"Nothing to update ({time.monotonic() - started:.1f}s).")
+        return changes
+
+    now = int(time.time())
+
+    def apply(kind, record, record_id, state, missing):
+        if state is None:
+            return
+        if missing:
+            record.setdefault("missing_since", now)
+            if now - record["missing_since"] >= settings.reconcile_receipt_timeout:
+                state = "invalid"
         else:
-            # Assume Cobo UUID
-            if verify_cobo_tx(tx_id):
-                is_valid = True
-            else:
-                print(f"❌ Removing Failed/Missing Cobo Mint: {tx_id}")
-        
-        if is_valid:
-            valid_mints.append(m)
-            
+            record.pop("missing_since", None)
+        previous = database.verification_state(record)
+        if previous != state:
+            change = {"kind": kind, "id": record_id, "from": previous, "to": state}
+            changes.append(change)
+            print(json.dumps(change))
+        record["verification"] = state
+        record["last_checked"] = now
+        if state == "finalized":
+            record["finalized"] = True
+
+    # One transaction patching only the checked records; records added
+    # while we were verifying stay unverified for the next run
+    with database.transaction() as db:
+        for c in db["contracts"]:
+            key = database.contract_key(c)
+            if key in contract_states and due(c):
+                apply("contract", c, c.get("cobo_id") or c.get("tx_hash") or c.get("name"), contract_states[key],
+                      key in missing)
+        for m in db["mints"]:
+            tx_id = m.get("tx_id")
+            if tx_id in mint_states and due(m) and mint_states[tx_id]:
+                db["mints"].touch(m)
+                apply("mint", m, tx_id, mint_states[tx_id], tx_id in missing)
+        db.setdefault("reconcile", {})["last_run"] = now
+
     # Summary
-    print(f"Contracts: {len(data.get('contracts', []))} -> {len(valid_contracts)}")
-    print(f"Mints: {len(data.get('mints', []))} -> {len(valid_mints)}")
-    
-    # Save
-    data["contracts"] = valid_contracts
-    data["mints"] = valid_mints
-    save_db(data)
+    totals = {}
+    for change in changes:
+        totals[change["to"]] = totals.get(change["to"], 0) + 1
+    print(f"💾 {len(changes)} state changes {totals} in {time.monotonic() - started:.1f}s.")
+    return changes
 
 if __name__ == "__main__":
-    reconcile()
+    parser = argparse.ArgumentParser(description="Verify contracts and mints against Cobo and the chain.")
+    parser.add_argument("--full", action="store_true", help="Re-verify finalized and invalid records too.")
+    args = parser.parse_args()
+    reconcile(full=args.full)
@@ -0,0 +1,38 @@
+import sys
+import os
+import time
+import argparse
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import database
+from backend.services import issuance
+
+
+def backfill_rollups():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the hourly / daily issuance rollups from every mint in the store.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be written without saving.")
+    args = parser.parse_args()
+
+    start = time.time()
+    if args.dry_run:
+        data = database.load_db()
+        table = issuance.build(data)
+    else:
+        with database.transaction() as data:
+            table = issuance.build(data)
+            data["issuance"] = table
+
+    series = len(table.get("day", {}))
+    buckets = {bucket: sum(len(rows) for rows in table.get(bucket, {}).values()) for bucket in issuance.BUCKETS}
+    print(
+        f"{'🔍 Would write' if args.dry_run else '✅ Rebuilt'} issuance rollups: {len(data.get('mints', []))} mints, "
+        f"{series} token partitions, {buckets['day']} daily / {buckets['hour']} hourly buckets "
+        f"in {time.time() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    backfill_rollups()
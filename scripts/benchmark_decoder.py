@@ -0,0 +1,129 @@
+import sys
+import os
+import time
+import argparse
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from eth_abi import encode
+from eth_utils import keccak
+from hexbytes import HexBytes
+from tabulate import tabulate
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from backend.services import log_decoder
+
+ISSUED = keccak(text="IssuedByPartition(bytes32,address,address,uint256,bytes,bytes)")
+TRANSFER = keccak(text="TransferByPartition(bytes32,address,address,address,uint256,bytes,bytes)")
+ERC20_TRANSFER = keccak(text="Transfer(address,address,uint256)")
+TOKEN = "0x" + "11" * 20
+
+
+def _word(address: str) -> bytes:
+    return b"\x00" * 12 + bytes.fromhex(address[2:])
+
+
+def make_logs(count: int) -> list:
+    """Synthetic eth_getLogs output: issuances, transfers and unrelated ERC20 logs."""
+    logs = []
+    for i in range(count):
+        holder = "0x" + f"{i:040x}"
+        other = "0x" + f"{i + 1:040x}"
+        partition = b"Class A".ljust(32, b"\x00")
+        kind = i % 3
+        if kind == 0:
+            topics = [ISSUED, partition, _word("0x" + "ab" * 20), _word(holder)]
+            data = encode(["uint256", "bytes", "bytes"], [(i + 1) * 10 ** 18, b"", b""])
+        elif kind == 1:
+            topics = [TRANSFER, partition, _word(holder), _word(other)]
+            data = encode(["address", "uint256", "bytes", "bytes"], [holder, i * 10 ** 18, b"", b""])
+        else:
+            topics = [ERC20_TRANSFER, _word(holder), _word(other)]
+            data = encode(["uint256"], [i])
+        logs.append(AttributeDict({
+            "address": Web3.to_checksum_address(TOKEN),
+            "topics": [HexBytes(t) for t in topics],
+            "data": HexBytes(data),
+            "blockNumber": 1000 + i,
+            "blockHash": HexBytes(keccak(text=f"block{i}")),
+            "transactionHash": HexBytes(keccak(text=f"tx{i}")),
+            "transactionIndex": 0,
+            "logIndex": 0,
+            "removed": False,
+        }))
+    return logs
+
+
+def _from_event_data(event) -> dict:
+    """A web3 EventData in the decoder's output format, for comparison."""
+    args = event["args"]
+    partition = args["partition"] if event["event"] == "IssuedByPartition" else args["fromPartition"]
+    return {
+        "event": event["event"],
+        "contract_address": event["address"],
+        "partition": log_decoder.decode_partition(partition),
+        "operator": args["operator"],
+        "from": args.get("from"),
+        "to": args["to"],
+        "value": int(args["value"]),
+        "tx_hash": log_decoder.hex_str(event["transactionHash"]),
+        "log_index": int(event["logIndex"]),
+        "block_number": int(event["blockNumber"]),
+        "block_hash": log_decoder.hex_str(event["blockHash"]),
+    }
+
+
+def decode_with_process_log(logs: list) -> list:
+    """The previous approach: try each contract event's process_log, relying on exceptions."""
+    contract = Web3().eth.contract(abi=list(log_decoder.TOPIC_EVENTS.values()))
+    events = (contract.events.IssuedByPartition(), contract.events.TransferByPartition())
+    decoded = []
+    for log in logs:
+        for event in events:
+            try:
+                decoded.append(event.process_log(log))
+                break
+            except Exception:
+                continue
+    return decoded
+
+
+def run(label: str, fn, logs: list) -> tuple:
+    """Time one decoder from a cold address cache. Returns (table row, decoded events)."""
+    log_decoder._checksum.cache_clear()
+    started = time.perf_counter()
+    decoded = fn(logs)
+    elapsed = time.perf_counter() - started
+    return [label, len(decoded), f"{elapsed:.3f}", f"{len(logs) / elapsed:,.0f}"], decoded
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(description="Compare the topic0 decoder with web3 process_log.")
+    parser.add_argument("--logs", type=int, default=30000, help="Number of synthetic logs to decode.")
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 2),
+                        help="Processes for the parallel run (at least 2 for a process pool).")
+    args = parser.parse_args()
+
+    logs = make_logs(args.logs)
+    baseline_row, baseline = run("web3 process_log", decode_with_process_log, logs)
+    serial_row, serial = run("topic0 decoder", log_decoder.decode_batch, logs)
+    if args.workers > 1 and len(logs) >= log_decoder.PARALLEL_DECODE_THRESHOLD:
+        label = f"topic0 decoder, pool of {args.workers} procs on {os.cpu_count()} CPUs (incl. start-up)"
+    else:
+        # decode_logs() stays in-process for these; don't present it as a pool measurement
+        label = "topic0 decoder via decode_logs (in-process)"
+    parallel_row, parallel = run(label, lambda l: log_decoder.decode_logs(l, workers=args.workers), logs)
+
+    expected = [_from_event_data(e) for e in baseline]
+    for name, decoded in (("topic0 decoder", serial), ("decode_logs", parallel)):
+        if decoded != expected:
+            mismatch = next((i for i, (a, b) in enumerate(zip(decoded, expected)) if a != b), min(len(decoded), len(expected)))
+            print(f"❌ {name} output differs from web3 process_log (first difference at event {mismatch})")
+            sys.exit(1)
+    print(f"✅ All decoders agree on {len(expected)} events")
+    print(tabulate([baseline_row, serial_row, parallel_row], headers=["decoder", "events", "seconds", "logs/sec"]))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,75 @@
+import os
+import re
+import sys
+import argparse
+import subprocess
+from tabulate import tabulate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# SDKs a cold start of the API must not import before the first request needs them
+DEFERRED_MODULES = ("web3", "cobo_waas2", "numpy", "eth_account", "uvicorn")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def measure(module):
+    """
+    Import `module` in a fresh interpreter under `-X importtime`.
+
+    Returns:
+        list: (cumulative microseconds, depth, module name) per imported module
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+
+def check_import_time():
+    parser = argparse.ArgumentParser(description="Cold-start import budget check (python -X importtime).")
+    parser.add_argument("--module", default="backend.main", help="Module to import.")
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="Fail if the median import time exceeds this.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to measure (median is used).")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list.")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals = sorted(next(us for us, _, name in rows if name == args.module) for rows in runs)
+    median_ms = totals[len(totals) // 2] / 1000
+    last = runs[-1]
+
+    # Direct imports of the module, slowest first
+    depth = next(d for _, d, name in last if name == args.module)
+    children = sorted(((us, name) for us, d, name in last if d == depth + 1), reverse=True)
+    print(tabulate([[name, f"{us / 1000:.1f}"] for us, name in children[:args.top]],
+                   headers=["import", "cumulative ms"]))
+    print(f"\n⏱️  import {args.module}: median {median_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    imported = {name for _, _, name in last}
+    for heavy in DEFERRED_MODULES:
+        if heavy in imported:
+            failures.append(f"{heavy} is imported eagerly")
+    if median_ms > args.budget_ms:
+        failures.append(f"{median_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Cold-start import budget met")
+
+
+if __name__ == "__main__":
+    check_import_time()
@@ -0,0 +1,37 @@
+import sys
+import os
+import json
+import argparse
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import database
+
+
+def export_db():
+    parser = argparse.ArgumentParser(
+        description="Pretty-print the store (saved compactly) for reading or diffing.")
+    parser.add_argument("--out", help="File to write (default: stdout).")
+    parser.add_argument("--collection", help="Only export one collection, e.g. contracts or mints.")
+    parser.add_argument("--indent", type=int, default=2)
+    args = parser.parse_args()
+
+    data = database.load_db()
+    if args.collection:
+        if args.collection not in data:
+            print(f"❌ No collection '{args.collection}' (have: {', '.join(data)})", file=sys.stderr)
+            sys.exit(1)
+        data = data[args.collection]
+
+    text = json.dumps(data, indent=args.indent, sort_keys=True) + "\n"
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+        print(f"💾 Exported {database.DB_FILE} to {args.out} ({len(text):,} bytes)")
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    export_db()
@@ -0,0 +1,78 @@
+import time
+import asyncio
+import argparse
+import aiohttp
+from tabulate import tabulate
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def client(session, base_url, paths, offset, deadline, stats):
+    """One simulated user: requests the paths round-robin until the deadline."""
+    i = offset
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.monotonic()
+        try:
+            async with session.get(base_url + path) as resp:
+                await resp.read()
+                status = resp.status
+        except Exception as e:
+            status = type(e).__name__
+        entry = stats.setdefault(path, {"latencies": [], "statuses": {}})
+        entry["latencies"].append(time.monotonic() - started)
+        entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+
+
+async def run(base_url, paths, clients, duration):
+    stats = {}
+    connector = aiohttp.TCPConnector(limit=clients)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        deadline = time.monotonic() + duration
+        started = time.monotonic()
+        await asyncio.gather(*(client(session, base_url, paths, i, deadline, stats) for i in range(clients)))
+        elapsed = time.monotonic() - started
+    return stats, elapsed
+
+
+def load_test():
+    parser = argparse.ArgumentParser(description="Hammer the API with concurrent clients and report requests/sec.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running API.")
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="Path to request (repeat for a mix; clients cycle through them). Default: /tokens")
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds to run.")
+    args = parser.parse_args()
+    paths = args.paths or ["/tokens"]
+
+    print(f"🚀 {args.clients} clients for {args.duration:.0f}s against {args.url}")
+    stats, elapsed = asyncio.run(run(args.url.rstrip("/"), paths, args.clients, args.duration))
+
+    rows = []
+    total = 0
+    for path in paths:
+        entry = stats.get(path, {"latencies": [], "statuses": {}})
+        latencies = entry["latencies"]
+        total += len(latencies)
+        rows.append([
+            path,
+            len(latencies),
+            f"{len(latencies) / elapsed:.1f}",
+            f"{percentile(latencies, 50) * 1000:.0f}",
+            f"{percentile(latencies, 95) * 1000:.0f}",
+            f"{percentile(latencies, 99) * 1000:.0f}",
+            ", ".join(f"{k}: {v}" for k, v in sorted(entry["statuses"].items(), key=str)),
+        ])
+    print(tabulate(rows, headers=["path", "requests", "req/s", "p50 ms", "p95 ms", "p99 ms", "statuses"]))
+    print(f"Total: {total / elapsed:.1f} req/s")
+
+
+if __name__ == "__main__":
+    load_test()